@@ -1,29 +1,39 @@
 import itertools
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
 
 logger = getLogger()
 
 
+def run_concurrently(func, items, config):
+    """Calls func for every item by config.concurrency parallel workers. All actions of a simulated user are performed
+    by a single call, so they keep their order while different users are simulated in parallel.
+    :returns
+        list - results in the order of items"""
+    with ThreadPoolExecutor(max_workers=config.concurrency) as executor:
+        return list(executor.map(func, items))
+
+
 def sign_up_users(api_connector, config):
-    users = []
-    for user_number in range(config.number_of_users):
-        users.append(api_connector.create_user())
-    return users
+    return run_concurrently(lambda _: api_connector.create_user(), range(config.number_of_users), config)
 
 
 def create_posts(users, api_connector, config):
-    for user in users:
+    def create_posts_for_user(user):
         api_connector.crate_posts_for_user(
             user=user,
             max_number=random.randint(1, config.max_posts_per_user)
         )
+    run_concurrently(create_posts_for_user, users, config)
 
 
 def perform_likes(user, users_with_no_likes, api_connector, config):
     available_likes = config.max_likes_per_user
     # User cant be liking himself
     users = itertools.cycle(list(filter(lambda x: x['username'] != user['username'], users_with_no_likes)))
+    posts_to_like = []
     while available_likes:
         user_with_unliked_posts = next(users)
         posts = api_connector.get_posts_for_user(
@@ -31,17 +41,25 @@ def perform_likes(user, users_with_no_likes, api_connector, config):
             api_user=user)
         if not posts:
             continue
-        api_connector.like_post(user, posts[random.randint(0, len(posts)-1)])
+        posts_to_like.append(posts[random.randint(0, len(posts)-1)])
         available_likes -= 1
+    # All chosen posts are liked with one batch request
+    api_connector.like_posts(user, posts_to_like)
 
 
 def like_posts(users, api_connector, config):
-    # Sorted users by max number of posts
-    users.sort(key=lambda u: len(u['posts']))
-    while users:
-        user = users.pop()
+    # Users with max number of posts start first
+    users.sort(key=lambda u: len(u['posts']), reverse=True)
+    # Once there are no users with unliked posts the rest of users do not start liking
+    nothing_to_like = threading.Event()
+
+    def like_posts_by_user(user):
+        if nothing_to_like.is_set():
+            return
         api_connector.get_jwt_token(user)
         least_favorite_users = api_connector.get_users_with_no_likes(user)
         if not least_favorite_users:
-            break
+            nothing_to_like.set()
+            return
         perform_likes(user, least_favorite_users, api_connector, config)
+    run_concurrently(like_posts_by_user, users, config)
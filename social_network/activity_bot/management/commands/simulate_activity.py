@@ -1,5 +1,6 @@
 import logging
 import os
+import time
 from collections import namedtuple
 
 import yaml
@@ -7,6 +8,7 @@ from django.core.management.base import BaseCommand
 
 from social_network.activity_bot.actions import (create_posts, like_posts,
                                                  sign_up_users)
+from social_network.activity_bot.metrics import MetricsRecorder
 from social_network.activity_bot.social_network_client import \
     SocialApiConnector
 
@@ -20,25 +22,47 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('bot_config_file_path', nargs='+', type=str)
+        parser.add_argument('--no-keep-alive', action='store_true',
+                            help='Open a new connection for every request instead of pooled connections')
+        parser.add_argument('--metrics-json', help='File to dump latency statistics per phase and endpoint')
 
     def handle(self, *args, **options):
         bot_config = self.read_bot_config_file(options['bot_config_file_path'][0])
-        api_connector = SocialApiConnector()
+        metrics = MetricsRecorder()
+        api_connector = SocialApiConnector(pool_size=bot_config.pool_size, max_retries=bot_config.max_retries,
+                                           keep_alive=not options['no_keep_alive'], metrics=metrics)
+        started_at = time.monotonic()
         logger.info('Start activity process')
         logger.info('Start creation of users')
-        users = sign_up_users(api_connector, bot_config)
+        with metrics.phase('sign up'):
+            users = sign_up_users(api_connector, bot_config)
         logger.info('Start creation of posts')
-        create_posts(users, api_connector, bot_config)
+        with metrics.phase('create posts'):
+            create_posts(users, api_connector, bot_config)
         logger.info('Start performing likes all posts')
-        like_posts(users, api_connector, bot_config)
+        with metrics.phase('like posts'):
+            like_posts(users, api_connector, bot_config)
         logger.info('Activity simulation is finished')
+        elapsed = time.monotonic() - started_at
+        logger.info(f'{metrics.requests_count} requests in {elapsed:.2f}s: '
+                    f'{metrics.requests_count / elapsed:.2f} requests/second')
+        token_manager = api_connector.token_manager
+        logger.info(f'{token_manager.logins} password logins, {token_manager.avoided_logins} avoided: '
+                    f'{token_manager.refreshes} token refreshes, '
+                    f'{token_manager.reused_sessions} sessions with cached tokens')
+        logger.info(metrics.format_report())
+        if options['metrics_json']:
+            metrics.dump_json(options['metrics_json'])
 
     @staticmethod
     def read_bot_config_file(config_file_path):
         if not os.path.isfile(config_file_path):
             raise FileNotFoundError(f'Config file path must be specified correctly. {config_file_path} is not valid.')
 
-        Config = namedtuple('Config', ['number_of_users', 'max_posts_per_user', 'max_likes_per_user'])
+        # Number of users simulated in parallel is optional, users are simulated one by one by default
+        Config = namedtuple('Config', ['number_of_users', 'max_posts_per_user', 'max_likes_per_user', 'concurrency',
+                                       'pool_size', 'max_retries'],
+                            defaults=(1, 10, 3))
         with open(config_file_path) as file:
             # TODO: error handling while for invalid formats
             config_yml = yaml.load(file, Loader=yaml.FullLoader)
@@ -0,0 +1,112 @@
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+
+class LatencyHistogram:
+    """HDR style histogram of latencies in microseconds.
+    Values are counted in buckets which width grows with the value: every power of two range is split into
+    2 ^ SUB_BUCKET_BITS buckets, so any percentile is reported with relative error below 1% using constant memory.
+    """
+    SUB_BUCKET_BITS = 7
+
+    def __init__(self):
+        self.counts = Counter()
+        self.total = 0
+
+    @classmethod
+    def bucket_bounds(cls, value):
+        shift = max(value.bit_length() - cls.SUB_BUCKET_BITS, 0)
+        lowest = (value >> shift) << shift
+        return lowest, lowest + (1 << shift) - 1
+
+    def record(self, seconds):
+        value = max(int(seconds * 1_000_000), 0)
+        self.counts[self.bucket_bounds(value)[0]] += 1
+        self.total += 1
+
+    def percentile(self, percent):
+        """Returns latency in seconds which is not exceeded by `percent` of recorded values"""
+        if not self.total:
+            return 0
+        rank = percent / 100 * self.total
+        seen = 0
+        for lowest in sorted(self.counts):
+            seen += self.counts[lowest]
+            if seen >= rank:
+                break
+        lowest, highest = self.bucket_bounds(lowest)
+        return (lowest + highest) / 2 / 1_000_000
+
+
+class EndpointStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+
+
+class MetricsRecorder:
+    """Thread safe recorder of api requests latencies grouped by simulation phase and endpoint"""
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self):
+        self.stats = defaultdict(EndpointStats)
+        self.durations = {}
+        self.current_phase = None
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        self.current_phase = name
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0) + time.monotonic() - started_at
+            self.current_phase = None
+
+    def record(self, endpoint, seconds, error=False):
+        with self.lock:
+            stats = self.stats[(self.current_phase, endpoint)]
+            stats.histogram.record(seconds)
+            stats.errors += int(error)
+
+    @property
+    def requests_count(self):
+        return sum(stats.histogram.total for stats in self.stats.values())
+
+    def report(self):
+        """:returns
+            list - dict of request statistics per phase and endpoint. Latencies are in milliseconds"""
+        rows = []
+        for (phase, endpoint), stats in self.stats.items():
+            count = stats.histogram.total
+            duration = self.durations.get(phase)
+            row = {
+                'phase': phase,
+                'endpoint': endpoint,
+                'requests': count,
+                'errors': stats.errors,
+                'error_rate': stats.errors / count,
+                'throughput': count / duration if duration else None,
+            }
+            for percent in self.PERCENTILES:
+                row[f'p{percent}'] = stats.histogram.percentile(percent) * 1000
+            rows.append(row)
+        return rows
+
+    def format_report(self):
+        lines = [f'{"phase":<14}{"endpoint":<16}{"requests":>9}{"errors":>8}{"req/s":>9}'
+                 f'{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}']
+        for row in self.report():
+            throughput = '-' if row['throughput'] is None else f'{row["throughput"]:.1f}'
+            lines.append(f'{str(row["phase"]):<14}{row["endpoint"]:<16}{row["requests"]:>9}'
+                         f'{row["error_rate"]:>8.1%}{throughput:>9}'
+                         f'{row["p50"]:>9.1f}{row["p95"]:>9.1f}{row["p99"]:>9.1f}')
+        return '\n'.join(lines)
+
+    def dump_json(self, path):
+        with open(path, 'w') as file:
+            json.dump({'durations': self.durations, 'endpoints': self.report()}, file, indent=2)
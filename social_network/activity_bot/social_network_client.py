@@ -1,29 +1,50 @@
+import time
 import uuid
 
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from social_network.activity_bot.metrics import MetricsRecorder
+from social_network.activity_bot.tokens import TokenManager
 
 
 class SocialApiConnector:
     # TODO: error handling for external requests and json decode
-    def __init__(self):
+    def __init__(self, pool_size=10, max_retries=3, keep_alive=True, metrics=None):
+        """
+        :param pool_size: max number of kept alive connections to the api
+        :param max_retries: number of retries of failed connections and of idempotent requests answered with 5xx
+        :param keep_alive: if False every request opens a new connection. Allows to compare throughput with pooling
+        :param metrics: MetricsRecorder that receives latency of every request
+        """
+        self.session = self.create_session(pool_size, max_retries)
+        self.http = self.session if keep_alive else requests
+        self.metrics = metrics or MetricsRecorder()
+        self.token_manager = TokenManager(self)
         self.api_url = settings.API_URL
         self.posts_by_user_url = f'{self.api_url}api/posts/?creator={{id}}'
         self.create_user_url = f'{self.api_url}api/users/signup/'
         self.token_url = f'{self.api_url}api/token/'
+        self.token_refresh_url = f'{self.api_url}api/token/refresh/'
         self.users_with_unliked_post_url = f'{self.api_url}api/users/least_favorite/'
         self.create_post_url = f'{self.api_url}api/posts/'
+        self.like_posts_url = f'{self.api_url}api/posts/like/'
+        # Url to (ETag, posts) of the last posts list response. Unchanged posts are not downloaded again
+        self.posts_cache = {}
 
     def get_users_with_no_likes(self, user):
         response = self.request_with_jwt(user=user,
                                          data=None,
                                          method='get',
-                                         url=self.users_with_unliked_post_url)
-        return response.json()
+                                         url=self.users_with_unliked_post_url,
+                                         endpoint='least_favorite')
+        return response.json()['results']
 
     def create_user(self):
         payload = self.generate_user_payload()
-        response = requests.post(self.create_user_url, json=payload)
+        response = self.send('post', self.create_user_url, 'signup', json=payload)
         if response.status_code != 201:
             raise ValueError(response.json())
         payload.update(response.json())
@@ -33,41 +54,79 @@ class SocialApiConnector:
         if 'id' not in target_user:
             return []
         url = self.posts_by_user_url.format(id=target_user.get('id'))
-        response = self.get_jwt_request(user=api_user, data=None, url=url)
-        return response.json()
+        etag, posts = self.posts_cache.get(url, (None, None))
+        headers = {'If-None-Match': etag} if etag else {}
+        response = self.get_jwt_request(user=api_user, data=None, url=url, endpoint='posts list', headers=headers)
+        if response.status_code == 304:
+            return posts
+        posts = response.json()['results']
+        if 'ETag' in response.headers:
+            self.posts_cache[url] = (response.headers['ETag'], posts)
+        return posts
 
-    def like_post(self, user, post):
-        if not post:
+    def like_posts(self, user, posts):
+        post_ids = [post['id'] for post in posts if post]
+        if not post_ids:
             return
-        url = post['url'] + 'like/'
-        self.post_jwt_request(user=user, data=None, url=url)
+        self.post_jwt_request(user=user, data={'posts': post_ids}, url=self.like_posts_url, endpoint='like')
 
-    def get_jwt_token(self, user):
-        response = requests.post(self.token_url, data={'username': user['username'], 'password': user['password']})
-        user.update({'jwt_tokens': response.json()})
+    def get_jwt_token(self, user, new_session=True):
+        user.update({'jwt_tokens': self.token_manager.get_tokens(user, new_session)})
+
+    def obtain_jwt_token(self, user):
+        response = self.send('post', self.token_url, 'token',
+                             data={'username': user['username'], 'password': user['password']})
+        return response.json()
+
+    def refresh_jwt_token(self, refresh_token):
+        """:returns
+            dict - new access token or None if the refresh token is rejected"""
+        response = self.send('post', self.token_refresh_url, 'token refresh', data={'refresh': refresh_token})
+        if response.status_code != 200:
+            return None
+        return response.json()
 
     def crate_posts_for_user(self, user, max_number):
-        user['posts'] = []
         self.get_jwt_token(user)
-        for _ in range(max_number):
-            response = self.post_jwt_request(user=user,
-                                             data=self.generate_post_payload(user),
-                                             url=self.create_post_url)
-            user['posts'].append(response.json())
+        # All posts of the user are created with one bulk request
+        response = self.post_jwt_request(user=user,
+                                         data=[self.generate_post_payload(user) for _ in range(max_number)],
+                                         url=self.create_post_url,
+                                         endpoint='posts create')
+        user['posts'] = response.json()
 
-    @staticmethod
-    def post_jwt_request(user, data, url):
-        return SocialApiConnector.request_with_jwt(user, data, 'post', url)
+    def post_jwt_request(self, user, data, url, endpoint):
+        return self.request_with_jwt(user, data, 'post', url, endpoint)
 
-    @staticmethod
-    def get_jwt_request(user, data, url):
-        return SocialApiConnector.request_with_jwt(user, data, 'get', url)
+    def get_jwt_request(self, user, data, url, endpoint, headers=None):
+        return self.request_with_jwt(user, data, 'get', url, endpoint, headers)
+
+    def request_with_jwt(self, user, data, method, url, endpoint, headers=None):
+        self.get_jwt_token(user, new_session=False)
+        jwt_auth_header = {'Authorization': f'Bearer {user["jwt_tokens"]["access"]}', **(headers or {})}
+        return self.send(method, url, endpoint, json=data, headers=jwt_auth_header)
+
+    def send(self, method, url, endpoint, **kwargs):
+        started_at = time.monotonic()
+        try:
+            response = self.http.request(method, url, **kwargs)
+        except requests.RequestException:
+            self.metrics.record(endpoint, time.monotonic() - started_at, error=True)
+            raise
+        self.metrics.record(endpoint, time.monotonic() - started_at, error=response.status_code >= 400)
+        return response
 
     @staticmethod
-    def request_with_jwt(user, data, method, url):
-        jwt_auth_header = {'Authorization': f'Bearer {user["jwt_tokens"]["access"]}'}
-        method = getattr(requests, method)
-        return method(url, json=data, headers=jwt_auth_header)
+    def create_session(pool_size, max_retries):
+        # Connection errors are retried for any method, 5xx responses only for idempotent methods,
+        # so posts and users are not created twice
+        retry = Retry(total=max_retries, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
 
     @staticmethod
     def generate_post_payload(user):
@@ -0,0 +1,65 @@
+import base64
+import json
+import threading
+import time
+from collections import defaultdict
+
+
+def get_token_expiration(token):
+    """Reads expiration timestamp from JWT payload. Signature is not verified, the api does it"""
+    payload = token.split('.')[1]
+    payload += '=' * (-len(payload) % 4)
+    return json.loads(base64.urlsafe_b64decode(payload))['exp']
+
+
+class TokenManager:
+    """Caches access/refresh token pairs per user.
+    Password login is the most expensive api request, so it is performed only once per user or when the refresh
+    token is expired. Access token is refreshed when it expires in less than `refresh_margin` seconds.
+    """
+
+    def __init__(self, api_connector, refresh_margin=30):
+        self.api_connector = api_connector
+        self.refresh_margin = refresh_margin
+        self.tokens = {}
+        self.user_locks = defaultdict(threading.Lock)
+        self.lock = threading.Lock()
+        self.logins = 0
+        self.refreshes = 0
+        # Sessions of users started with a cached token. Every session used to start with a password login
+        self.reused_sessions = 0
+
+    @property
+    def avoided_logins(self):
+        return self.refreshes + self.reused_sessions
+
+    def is_valid(self, token):
+        return get_token_expiration(token) - self.refresh_margin > time.time()
+
+    def get_tokens(self, user, new_session=False):
+        """
+        :param new_session: True if the user starts a sequence of requests, False for tokens of every request
+        :returns
+            dict - valid access and refresh tokens of the user"""
+        username = user['username']
+        with self.lock:
+            user_lock = self.user_locks[username]
+        with user_lock:
+            tokens = self.tokens.get(username)
+            if tokens and self.is_valid(tokens['access']):
+                if new_session:
+                    self.count('reused_sessions')
+                return tokens
+            if tokens and self.is_valid(tokens['refresh']):
+                refreshed = self.api_connector.refresh_jwt_token(tokens['refresh'])
+                if refreshed:
+                    self.count('refreshes')
+                    self.tokens[username] = {**tokens, **refreshed}
+                    return self.tokens[username]
+            self.count('logins')
+            self.tokens[username] = self.api_connector.obtain_jwt_token(user)
+            return self.tokens[username]
+
+    def count(self, counter):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
@@ -0,0 +1 @@
+default_app_config = 'social_network.post.apps.PostConfig'
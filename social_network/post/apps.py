@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 
 class PostConfig(AppConfig):
-    name = 'post'
+    name = 'social_network.post'
+    label = 'post'
+
+    def ready(self):
+        from social_network.post import signals  # noqa: F401
@@ -0,0 +1,128 @@
+"""Async views of the hot API paths, served by the ASGI application (social_network/asgi.py).
+
+ORM and DRF are synchronous, so database work is run with sync_to_async. On Django 3.1 it runs in one thread shared
+by all requests of the process, so database work of concurrent requests is serialized, but awaiting it does not
+block the event loop. External calls (Hunter), cache lookups and password hashing are run in separate threads. The
+event loop serves other requests while a request awaits them, so in-flight requests do not pin workers.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.http import JsonResponse
+from rest_framework import exceptions, status
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.parsers import JSONParser
+
+from social_network.post import least_favorite
+from social_network.post.authentication import JWTAuthentication
+from social_network.post.serializers import UserSerializer
+from social_network.post.utils import verify_email_async
+from social_network.post.views import PostViewSet, UserViewSet
+
+jwt_authentication = JWTAuthentication()
+
+
+class RequestUserAuthentication(BaseAuthentication):
+    """Authenticates DRF request with the user authenticated by the async view, so the token is not verified once
+    again"""
+
+    def authenticate(self, request):
+        user = getattr(request._request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return None
+        return user, None
+
+    def authenticate_header(self, request):
+        return jwt_authentication.authenticate_header(request)
+
+
+view_options = {'authentication_classes': [RequestUserAuthentication]}
+post_list_view = PostViewSet.as_view({'get': 'list'}, **view_options)
+post_detail_view = PostViewSet.as_view({'get': 'retrieve'}, **view_options)
+least_favorite_view = UserViewSet.as_view({'get': 'least_favorite'}, **view_options)
+
+
+def error_response(exc):
+    response = JsonResponse({'detail': exc.detail}, status=exc.status_code)
+    if isinstance(exc, (exceptions.AuthenticationFailed, exceptions.NotAuthenticated)):
+        response['WWW-Authenticate'] = jwt_authentication.authenticate_header(None)
+    return response
+
+
+def authenticate(request):
+    """:returns
+        User - user of the JWT token of the request
+    :raises
+        NotAuthenticated - if the request has no token
+        AuthenticationFailed - if the token is not valid or the user is not active"""
+    result = jwt_authentication.authenticate(request)
+    if result is None:
+        raise exceptions.NotAuthenticated()
+    return result[0]
+
+
+def call_view(view, request, user=None, **kwargs):
+    """Runs DRF view and renders its response. The view authenticates the request with the given user"""
+    if user is not None:
+        request.user = user
+    return view(request, **kwargs).render()
+
+
+async def authenticated_call(view, request, **kwargs):
+    try:
+        user = await sync_to_async(authenticate)(request)
+    except exceptions.APIException as exc:
+        return error_response(exc)
+    return await sync_to_async(call_view)(view, request, user, **kwargs)
+
+
+async def post_list(request):
+    return await authenticated_call(post_list_view, request)
+
+
+async def post_detail(request, pk):
+    return await authenticated_call(post_detail_view, request, pk=pk)
+
+
+async def users_least_favorite(request):
+    try:
+        user = await sync_to_async(authenticate)(request)
+    except exceptions.APIException as exc:
+        return error_response(exc)
+    # Cached result is returned without switching to the database thread. Cache backend could do network calls, so
+    # it is not called by the event loop
+    data = await sync_to_async(least_favorite.get_cached_result, thread_sensitive=False)(request.build_absolute_uri())
+    if data is not None:
+        return JsonResponse(data)
+    return await sync_to_async(call_view)(least_favorite_view, request, user)
+
+
+async def users_signup(request):
+    """Email is verified with Hunter before the user is created, the event loop is not blocked while the
+    verification is in flight. Password is hashed outside of the database thread"""
+    if request.method != 'POST':
+        return error_response(exceptions.MethodNotAllowed(request.method))
+    try:
+        data = JSONParser().parse(request)
+        email = data.get('email') if isinstance(data, dict) else None
+        await verify_email_async(email)
+    except exceptions.ParseError as exc:
+        return error_response(exc)
+    except exceptions.ValidationError as exc:
+        return JsonResponse({'email': exc.detail}, status=status.HTTP_400_BAD_REQUEST)
+    serializer = UserSerializer(data=data, context={'request': request, 'verified_email': email})
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    # Password is hashed in a separate thread, the database thread shared by requests only inserts the user
+    hashed_password = await sync_to_async(make_password, thread_sensitive=False)(
+        serializer.validated_data['password'])
+    return await sync_to_async(create_user)(serializer, hashed_password)
+
+
+def create_user(serializer, hashed_password):
+    serializer.save(hashed_password=hashed_password)
+    return JsonResponse(serializer.data, status=status.HTTP_201_CREATED)
+
+
+# Token is used for authentication, CSRF protection is not needed as for DRF views
+for async_view in (post_list, post_detail, users_least_favorite, users_signup):
+    async_view.csrf_exempt = True
@@ -0,0 +1,83 @@
+"""Stateless JWT authentication.
+
+Access tokens carry username, is_active and is_staff claims, so requests are authenticated from the token without
+a user query. The user row is fetched only when a view uses an attribute which is not in the claims. Changes of
+claimed attributes (e.g. deactivation) take effect once tokens issued before the change expire
+(ACCESS_TOKEN_LIFETIME). Tokens issued without the claims are authenticated with a user query. Permissions that
+must not rely on outdated claims check the database, see social_network.post.permissions.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils.functional import cached_property
+from rest_framework_simplejwt import authentication, models, serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from social_network.post.cache import LRUCache
+
+USER_CLAIMS = ('username', 'is_active', 'is_staff')
+
+# Field values of recently fetched users by id
+user_cache = LRUCache(max_size=settings.AUTH_USER_CACHE_SIZE)
+
+
+def get_cached_fields():
+    # Password hash is not kept in the process, it is loaded on access as a deferred field
+    return [field.attname for field in User._meta.concrete_fields if field.attname != 'password']
+
+
+def get_user(user_id):
+    """:returns
+        User - new instance of the user by id built from the cache or the database
+    :raises
+        User.DoesNotExist - if there is no such user"""
+    fields = get_cached_fields()
+    values = user_cache.get(user_id)
+    if values is None:
+        values = User.objects.filter(pk=user_id).values_list(*fields).get()
+        user_cache.set(user_id, values, settings.AUTH_USER_CACHE_TTL)
+    # Values are immutable, every caller gets its own instance, so changes of the instance are not shared
+    return User.from_db(User.objects.db, fields, values)
+
+
+class TokenUser(models.TokenUser):
+    """User represented by token claims. Attributes missing in the claims are taken from the user model instance
+    which is fetched on the first access"""
+
+    @cached_property
+    def is_active(self):
+        return self.token.get('is_active', True)
+
+    @cached_property
+    def user(self):
+        return get_user(self.id)
+
+    def __getattr__(self, name):
+        # Called only for attributes not defined by TokenUser
+        if name.startswith('_') or name == 'token':
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('Token contained no recognizable user identification')
+        if not validated_token['is_active']:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return TokenUser(validated_token)
+
+
+def add_user_claims(token, user):
+    """Adds claims of the user to the token. Access tokens created from the refresh token inherit them"""
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class TokenObtainPairSerializer(serializers.TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
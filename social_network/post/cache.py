@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from logging import getLogger
+
+from django.conf import settings
+from django.core.cache import caches
+
+metrics_logger = getLogger('social_network.metrics')
+
+
+class LRUCache:
+    """Thread safe in-process cache with least recently used eviction and per-entry timeout.
+    Implements the part of django cache API used by the project, so it could stand in for a configured cache.
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key not in self.entries:
+                return default
+            value, expires_at = self.entries[key]
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        expires_at = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            self.entries[key] = (value, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class CacheMetrics:
+    """Thread safe counters of cache hits and misses. Counters of the process are logged by "social_network.metrics"
+    logger every CACHE_METRICS_LOG_INTERVAL lookups"""
+
+    def __init__(self, name):
+        self.name = name
+        self.counter = Counter()
+        self.lock = threading.Lock()
+
+    def increment(self, name):
+        with self.lock:
+            self.counter[name] += 1
+            lookups = self.counter['hits'] + self.counter['domain_hits'] + self.counter['misses']
+            report = name != 'errors' and lookups % settings.CACHE_METRICS_LOG_INTERVAL == 0
+            counters = dict(self.counter)
+        if report:
+            metrics_logger.info(f'{self.name} cache: {self.format(counters)}')
+
+    @staticmethod
+    def format(counters):
+        hits = counters.get('hits', 0) + counters.get('domain_hits', 0)
+        lookups = hits + counters.get('misses', 0)
+        values = ', '.join(f'{name} {value}' for name, value in sorted(counters.items()))
+        return f'{values}, hit ratio {hits / lookups:.1%}' if lookups else values
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counter)
+
+    def reset(self):
+        with self.lock:
+            self.counter.clear()
+
+
+fallback_caches = {}
+
+
+def get_cache(alias):
+    """Returns django cache configured in CACHES by alias. In-process LRUCache is used if there is no such cache"""
+    if alias in settings.CACHES:
+        return caches[alias]
+    if alias not in fallback_caches:
+        fallback_caches[alias] = LRUCache(max_size=settings.FALLBACK_CACHE_MAX_SIZE)
+    return fallback_caches[alias]
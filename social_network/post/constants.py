@@ -5,3 +5,15 @@ class HunterCodes(Enum):
     UNDELIVERABLE = 'undeliverable'
     DELIVERABLE = 'deliverable'
     RISKY = 'risky'
+
+
+class LikeResults(Enum):
+    LIKED = 'liked'
+    ALREADY_LIKED = 'already_liked'
+    NOT_FOUND = 'not_found'
+
+
+# Value of "fans" query parameter that switches posts to the compact representation
+FANS_SUMMARY = 'summary'
+# Max number of fan ids that could be requested with "fan_sample" query parameter
+MAX_FAN_SAMPLE_SIZE = 20
@@ -0,0 +1,99 @@
+"""Maintenance of denormalized counters stored on Post and Profile and of UnlikedAuthor list derived from them.
+
+All changes are applied with F() expressions so concurrent requests do not overwrite each other.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils import timezone
+
+from social_network.post.models import Post, Profile, UnlikedAuthor
+
+# Sent with user_id once post_count or liked_post_count of the user profile is changed
+profile_counters_changed = Signal()
+
+
+@transaction.atomic
+def update_profile(user_id, **changes):
+    """Applies changes to the profile of the user. Profile is created if it does not exist yet"""
+    if not Profile.objects.filter(pk=user_id).update(**changes):
+        Profile.objects.get_or_create(user_id=user_id)
+        Profile.objects.filter(pk=user_id).update(**changes)
+    sync_unliked_author(user_id)
+    profile_counters_changed.send(sender=Profile, user_id=user_id)
+
+
+def sync_unliked_author(user_id):
+    """Adds the user to unliked authors if the user has posts and none of them is liked, removes otherwise"""
+    if Profile.objects.filter(pk=user_id, post_count__gte=1, liked_post_count=0).exists():
+        UnlikedAuthor.objects.bulk_create([UnlikedAuthor(user_id=user_id)], ignore_conflicts=True)
+    else:
+        UnlikedAuthor.objects.filter(pk=user_id).delete()
+
+
+def posts_version_changes():
+    """:returns
+        dict - profile changes that mark posts of the user as modified"""
+    return {'posts_version': F('posts_version') + 1, 'posts_modified_at': timezone.now()}
+
+
+def posts_modified(*creator_ids):
+    """Marks posts of the creators as modified without changing counters"""
+    Profile.objects.filter(pk__in=creator_ids).update(**posts_version_changes())
+
+
+def post_created(creator_id, count=1):
+    update_profile(creator_id, post_count=F('post_count') + count, **posts_version_changes())
+
+
+def post_deleted(creator_id, fan_count):
+    changes = {'post_count': F('post_count') - 1, **posts_version_changes()}
+    if fan_count:
+        changes['liked_post_count'] = F('liked_post_count') - 1
+    update_profile(creator_id, **changes)
+
+
+@transaction.atomic
+def post_moved(old_creator_id, new_creator_id, fan_count):
+    """Moves counters of the post with its fans from the old creator to the new one"""
+    post_deleted(old_creator_id, fan_count)
+    changes = {'post_count': F('post_count') + 1, **posts_version_changes()}
+    if fan_count:
+        changes['liked_post_count'] = F('liked_post_count') + 1
+    update_profile(new_creator_id, **changes)
+
+
+@transaction.atomic
+def post_liked(post_id, creator_id, count=1):
+    """Registers new fans of the post. The creator gets one more liked post once the post receives its first fan"""
+    if Post.objects.filter(pk=post_id, fan_count=0).update(fan_count=count):
+        update_profile(creator_id, liked_post_count=F('liked_post_count') + 1, **posts_version_changes())
+        return
+    Post.objects.filter(pk=post_id).update(fan_count=F('fan_count') + count)
+    posts_modified(creator_id)
+
+
+@transaction.atomic
+def post_unliked(post_id, creator_id, count=1):
+    """Unregisters fans of the post. The creator loses a liked post once the post has no fans anymore"""
+    if Post.objects.filter(pk=post_id, fan_count=count).update(fan_count=0):
+        update_profile(creator_id, liked_post_count=F('liked_post_count') - 1, **posts_version_changes())
+        return
+    Post.objects.filter(pk=post_id, fan_count__gt=count).update(fan_count=F('fan_count') - count)
+    posts_modified(creator_id)
+
+
+@transaction.atomic
+def posts_liked(creators):
+    """Registers one new fan for each post
+    :param creators: dict - post id to id of the post creator"""
+    first_liked = Post.objects.select_for_update().filter(pk__in=creators, fan_count=0).values_list('pk', flat=True)
+    first_liked_creators = Counter(creators[post_id] for post_id in first_liked)
+    for creator_id, count in first_liked_creators.items():
+        update_profile(creator_id, liked_post_count=F('liked_post_count') + count, **posts_version_changes())
+    Post.objects.filter(pk__in=creators).update(fan_count=F('fan_count') + 1)
+    other_creators = set(creators.values()) - set(first_liked_creators)
+    if other_creators:
+        posts_modified(*other_creators)
@@ -0,0 +1,67 @@
+"""NDJSON export of users, posts and likes.
+
+Every line is a JSON object with "type" of the record: user, post or like. Users are exported first, then posts and
+likes, so records reference only records exported before them. Rows are read with QuerySet.iterator, memory used
+does not depend on the size of tables. Users, posts and likes added after the export has started are not exported.
+"""
+import json
+import zlib
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.db.models import Max
+from django.utils import timezone
+
+from social_network.post.models import Like, Post
+
+USER_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name', 'is_active', 'date_joined')
+POST_FIELDS = ('id', 'creator_id', 'data', 'created_at')
+LIKE_FIELDS = ('post_id', 'user_id', 'liked_at')
+
+# Lines are compressed in blocks of this size, so gzip works on more than one line at once
+GZIP_BLOCK_SIZE = 64 * 1024
+
+
+def iter_records(chunk_size):
+    """Yields dicts of users, posts and likes existing at the moment of the call"""
+    started_at = timezone.now()
+    last_user_id = User.objects.aggregate(last=Max('pk'))['last'] or 0
+    last_post_id = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+    tables = [
+        ('user', User.objects.filter(pk__lte=last_user_id), USER_FIELDS),
+        ('post', Post.objects.filter(pk__lte=last_post_id, creator__lte=last_user_id), POST_FIELDS),
+        ('like', Like.objects.filter(post__lte=last_post_id, user__lte=last_user_id, liked_at__lte=started_at),
+         LIKE_FIELDS),
+    ]
+    for record_type, queryset, fields in tables:
+        rows = queryset.order_by('pk').values_list(*fields).iterator(chunk_size=chunk_size)
+        for row in rows:
+            yield {'type': record_type, **dict(zip(fields, row))}
+
+
+def encode_value(value):
+    # DjangoJSONEncoder truncates microseconds, exported timestamps are kept exact
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def iter_lines(chunk_size):
+    """Yields NDJSON lines as bytes"""
+    for record in iter_records(chunk_size):
+        yield json.dumps(record, default=encode_value).encode() + b'\n'
+
+
+def gzip_stream(lines):
+    """Compresses stream of bytes into gzip format without keeping the whole stream in memory"""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    block = []
+    block_size = 0
+    for line in lines:
+        block.append(line)
+        block_size += len(line)
+        if block_size >= GZIP_BLOCK_SIZE:
+            yield compressor.compress(b''.join(block))
+            block, block_size = [], 0
+    yield compressor.compress(b''.join(block)) + compressor.flush()
+
@@ -0,0 +1,47 @@
+"""Precomputed feeds. Feed of a user consists of posts of authors whose posts the user has liked.
+
+Posts are added to feeds of fans by a background task once they are created (fan-out on write), so the number of
+fans of the author does not affect post creation. Posts created before the user liked the author are not added,
+unless the user liked the author before the task is executed.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from social_network.post.models import FeedEntry, Like, Post
+from social_network.post.tasks import enqueue
+
+
+def fan_out_async(creator_id, posts):
+    """Schedules adding just created posts of the creator to feeds of the creator fans. The task is stored by the
+    transaction that creates the posts. Executed by process_tasks management command
+    :param posts: list of Post. If posts were bulk created on a database that does not return ids (SQLite), posts
+        of the creator are selected by creation time, which also adds posts created concurrently by the creator"""
+    if all(post.pk is not None for post in posts):
+        return enqueue(fan_out, creator_id=creator_id, post_ids=[post.pk for post in posts])
+    return enqueue(fan_out, creator_id=creator_id, since=min(post.created_at for post in posts).isoformat())
+
+
+def fan_out(creator_id, post_ids=None, since=None):
+    """Adds posts of the creator to feeds of the creator fans. Fans are read and entries are inserted in batches of
+    FEED_FAN_OUT_BATCH, entries which already exist are skipped
+    :param post_ids: list - ids of the posts
+    :param since: str - ISO time, posts created since then are added if post_ids are not known"""
+    posts = Post.objects.filter(creator=creator_id)
+    if post_ids is not None:
+        posts = posts.filter(pk__in=post_ids)
+    else:
+        posts = posts.filter(created_at__gte=parse_datetime(since))
+    posts = list(posts.values_list('pk', 'created_at'))
+    if not posts:
+        return
+    fan_ids = Like.objects.filter(post__creator=creator_id).exclude(user=creator_id).\
+        values_list('user_id', flat=True).distinct().iterator(chunk_size=settings.FEED_FAN_OUT_BATCH)
+    entries = (FeedEntry(user_id=fan_id, post_id=post_id, created_at=created_at)
+               for fan_id in fan_ids for post_id, created_at in posts)
+    while True:
+        batch = list(islice(entries, settings.FEED_FAN_OUT_BATCH))
+        if not batch:
+            return
+        FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
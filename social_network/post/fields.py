@@ -0,0 +1,33 @@
+from urllib.parse import quote
+
+from rest_framework import serializers
+
+
+class CachedUrlMixin:
+    """Reverses the url once per view name and format and substitutes primary keys of following objects into it.
+    Serializer fields are shared by all rows of a list, so a page of posts costs one url reversing per field.
+    """
+    url_placeholder = '__pk__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.url_templates = {}
+
+    def get_url(self, obj, view_name, request, format):
+        if self.lookup_field != 'pk':
+            return super().get_url(obj, view_name, request, format)
+        if hasattr(obj, 'pk') and obj.pk in (None, ''):
+            return None
+        key = (view_name, format, request and request.get_host())
+        if key not in self.url_templates:
+            kwargs = {self.lookup_url_kwarg: self.url_placeholder}
+            self.url_templates[key] = self.reverse(view_name, kwargs=kwargs, request=request, format=format)
+        return self.url_templates[key].replace(self.url_placeholder, quote(str(obj.pk)))
+
+
+class CachedHyperlinkedRelatedField(CachedUrlMixin, serializers.HyperlinkedRelatedField):
+    pass
+
+
+class CachedHyperlinkedIdentityField(CachedUrlMixin, serializers.HyperlinkedIdentityField):
+    pass
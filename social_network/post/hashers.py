@@ -0,0 +1,62 @@
+"""Password hashing with configurable work factor and a bounded pool of hashing processes.
+
+PBKDF2 keeps a CPU busy for the whole work factor on every signup and token issuance. hashlib releases the GIL while
+hashing, so request threads already hash in parallel. With PASSWORD_HASHING_WORKERS hashes are computed by that many
+processes instead, which only caps the number of CPUs used for hashing at a time. Request threads are not freed, they
+wait for the hash in the queue of the pool, and every hash costs an inter-process round trip. The pool is created by
+every server worker process, so the total number of hashing processes is PASSWORD_HASHING_WORKERS times the number
+of gunicorn/uvicorn workers.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """:returns
+        ProcessPoolExecutor - pool of PASSWORD_HASHING_WORKERS processes or None if hashes are computed in place"""
+    global _executor
+    if not settings.PASSWORD_HASHING_WORKERS:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            # Forking a process with running request threads could copy locks held by them, workers are spawned
+            _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASHING_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+@receiver(setting_changed)
+def reset_executor(setting, **kwargs):
+    global _executor
+    if setting == 'PASSWORD_HASHING_WORKERS' and _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def pbkdf2_encode(password, salt, iterations):
+    return hashers.PBKDF2PasswordHasher().encode(password, salt, iterations)
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """Django PBKDF2 hasher with PASSWORD_HASH_ITERATIONS iterations computed by the hashing pool. Hashes are
+    compatible with Django hasher, passwords hashed with another work factor are rehashed on the next login"""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
+
+    def encode(self, password, salt, iterations=None):
+        iterations = iterations or self.iterations
+        executor = get_executor()
+        if executor is None:
+            return pbkdf2_encode(password, salt, iterations)
+        return executor.submit(pbkdf2_encode, password, salt, iterations).result()
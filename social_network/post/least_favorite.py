@@ -0,0 +1,32 @@
+"""Cache of least_favorite results.
+
+Results are stored per request url under a version key. Changing the version invalidates all stored results at
+once. The version is changed when profile counters are changed, so only posts creation/deletion and the first/last
+like of a post invalidate results. LEAST_FAVORITE_CACHE_TTL bounds staleness when the cache is shared by processes
+that do not see each other's invalidations (in-process fallback cache).
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+
+from social_network.post.cache import get_cache
+
+VERSION_KEY = 'least_favorite:version'
+
+
+def get_cache_key(url):
+    version = get_cache(settings.LEAST_FAVORITE_CACHE).get(VERSION_KEY, '')
+    return f'least_favorite:{version}:{hashlib.sha1(url.encode()).hexdigest()}'
+
+
+def get_cached_result(url):
+    return get_cache(settings.LEAST_FAVORITE_CACHE).get(get_cache_key(url))
+
+
+def cache_result(url, data):
+    get_cache(settings.LEAST_FAVORITE_CACHE).set(get_cache_key(url), data, settings.LEAST_FAVORITE_CACHE_TTL)
+
+
+def invalidate():
+    get_cache(settings.LEAST_FAVORITE_CACHE).set(VERSION_KEY, uuid.uuid4().hex, None)
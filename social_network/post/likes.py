@@ -0,0 +1,111 @@
+"""Like/unlike operations performed directly on the fans through table.
+Each operation costs a constant number of queries regardless of the number of fans of the post.
+"""
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from social_network.post import counters
+from social_network.post.constants import LikeResults
+from social_network.post.models import Like, Post
+
+
+def like_post(post_id, creator_id, user_id):
+    """Adds the user to the fans of the post.
+    :returns
+        False - if the user is already a fan of the post"""
+    try:
+        with transaction.atomic():
+            # Unique (post_id, user_id) constraint rejects concurrent duplicates
+            Like.objects.create(post_id=post_id, user_id=user_id)
+            counters.post_liked(post_id, creator_id)
+    except IntegrityError:
+        return False
+    return True
+
+
+@transaction.atomic
+def unlike_post(post_id, creator_id, user_id):
+    """Removes the user from the fans of the post.
+    :returns
+        False - if the user is not a fan of the post"""
+    deleted, _ = Like.objects.filter(post_id=post_id, user_id=user_id).delete()
+    if not deleted:
+        return False
+    counters.post_unliked(post_id, creator_id)
+    return True
+
+
+def like_posts(post_ids, user_id):
+    """Adds the user to the fans of every post with a constant number of queries
+    :returns
+        dict - post id to one of LikeResults values"""
+    creators = dict(Post.objects.filter(pk__in=post_ids).values_list('pk', 'creator_id'))
+    liked = set(Like.objects.filter(user_id=user_id, post_id__in=creators).values_list('post_id', flat=True))
+    new_likes = [post_id for post_id in creators if post_id not in liked]
+    # Transaction starts with the write. SQLite fails a transaction that has read and then has to wait for a write
+    # lock instead of waiting for it
+    with transaction.atomic():
+        # Likes inserted concurrently after the read above are skipped by the insert and are not counted
+        inserted = insert_likes(new_likes, user_id)
+        counters.posts_liked({post_id: creators[post_id] for post_id in inserted})
+    results = {}
+    for post_id in post_ids:
+        if post_id in inserted:
+            results[post_id] = LikeResults.LIKED.value
+        elif post_id in creators:
+            results[post_id] = LikeResults.ALREADY_LIKED.value
+        else:
+            results[post_id] = LikeResults.NOT_FOUND.value
+    return results
+
+
+def can_return_inserted():
+    """:returns
+        bool - if INSERT ... ON CONFLICT DO NOTHING RETURNING is supported by the database"""
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return connection.vendor == 'postgresql'
+
+
+def insert_likes(post_ids, user_id):
+    """Inserts likes of the user with one query, existing likes are skipped. Must be called in a transaction
+    :returns
+        set - ids of posts liked by this call"""
+    if not post_ids:
+        return set()
+    if not can_return_inserted():
+        likes = [Like(post_id=post_id, user_id=user_id) for post_id in post_ids]
+        Like.objects.bulk_create(likes, ignore_conflicts=True)
+        # Every like gets its liked_at on save, likes inserted concurrently have another time
+        attempted = {(like.post_id, like.liked_at) for like in likes}
+        return {post_id for post_id, liked_at in Like.objects.filter(user_id=user_id, post_id__in=post_ids).
+                values_list('post_id', 'liked_at') if (post_id, liked_at) in attempted}
+    table = connection.ops.quote_name(Like._meta.db_table)
+    liked_at = connection.ops.adapt_datetimefield_value(timezone.now())
+    values = ', '.join(['(%s, %s, %s)'] * len(post_ids))
+    # bulk_create with ignore_conflicts does not tell which rows were inserted, RETURNING does
+    query = (f'INSERT INTO {table} (post_id, user_id, liked_at) VALUES {values} '
+             f'ON CONFLICT (post_id, user_id) DO NOTHING RETURNING post_id')
+    with connection.cursor() as cursor:
+        cursor.execute(query, [value for post_id in post_ids for value in (post_id, user_id, liked_at)])
+        return {post_id for post_id, in cursor.fetchall()}
+
+
+def get_fan_samples(post_ids, size):
+    """Returns up to `size` latest fan ids for each post using one query
+    :returns
+        dict - post id to list of fan ids"""
+    samples = {post_id: [] for post_id in post_ids}
+    if not post_ids or size <= 0:
+        return samples
+    table = connection.ops.quote_name(Like._meta.db_table)
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    query = (f'SELECT post_id, user_id FROM ('
+             f'SELECT post_id, user_id, ROW_NUMBER() OVER (PARTITION BY post_id ORDER BY id DESC) AS position '
+             f'FROM {table} WHERE post_id IN ({placeholders})) AS fans '
+             f'WHERE position <= %s ORDER BY post_id, position')
+    with connection.cursor() as cursor:
+        cursor.execute(query, [*post_ids, size])
+        for post_id, user_id in cursor.fetchall():
+            samples[post_id].append(user_id)
+    return samples
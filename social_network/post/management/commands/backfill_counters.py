@@ -0,0 +1,66 @@
+import logging
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from social_network.post import counters, least_favorite
+from social_network.post.models import Like, Post, Profile, UnlikedAuthor
+
+logger = logging.getLogger()
+
+
+class Command(BaseCommand):
+    help = 'Recalculate post and profile counters and unliked authors from posts and likes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.backfill_posts(batch_size)
+        self.backfill_profiles(batch_size)
+        # Updates do not send signals, cached responses are invalidated here
+        least_favorite.invalidate()
+        logger.info('Counters are recalculated')
+
+    @staticmethod
+    def id_batches(queryset, batch_size):
+        """Yields (first_id, last_id) ranges so each update touches a limited number of rows"""
+        ids = queryset.order_by('pk').values_list('pk', flat=True)
+        last_id = 0
+        while True:
+            batch = list(ids.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                return
+            yield batch[0], batch[-1]
+            last_id = batch[-1]
+
+    def backfill_posts(self, batch_size):
+        fans = Like.objects.filter(post=OuterRef('pk')).order_by().values('post')
+        fan_count = Coalesce(Subquery(fans.annotate(count=Count('pk')).values('count')), 0)
+        for first_id, last_id in self.id_batches(Post.objects.all(), batch_size):
+            with transaction.atomic():
+                Post.objects.filter(pk__range=(first_id, last_id)).update(fan_count=fan_count)
+            logger.info(f'Posts {first_id}-{last_id} are recalculated')
+
+    def backfill_profiles(self, batch_size):
+        posts = Post.objects.filter(creator=OuterRef('user')).order_by().values('creator')
+        post_count = Coalesce(Subquery(posts.annotate(count=Count('pk')).values('count')), 0)
+        liked_post_count = Coalesce(
+            Subquery(posts.annotate(count=Count('pk', filter=Q(fan_count__gt=0))).values('count')), 0)
+        for first_id, last_id in self.id_batches(User.objects.all(), batch_size):
+            with transaction.atomic():
+                user_ids = User.objects.filter(pk__range=(first_id, last_id)).values_list('pk', flat=True)
+                Profile.objects.bulk_create([Profile(user_id=user_id) for user_id in user_ids],
+                                            ignore_conflicts=True)
+                profiles = Profile.objects.filter(pk__gte=first_id, pk__lte=last_id)
+                profiles.update(post_count=post_count, liked_post_count=liked_post_count,
+                                **counters.posts_version_changes())
+                unliked_authors = profiles.filter(post_count__gte=1, liked_post_count=0).values_list('pk', flat=True)
+                UnlikedAuthor.objects.filter(pk__gte=first_id, pk__lte=last_id).exclude(pk__in=unliked_authors).delete()
+                UnlikedAuthor.objects.bulk_create([UnlikedAuthor(user_id=user_id) for user_id in unliked_authors],
+                                                  ignore_conflicts=True)
+            logger.info(f'Profiles {first_id}-{last_id} are recalculated')
@@ -0,0 +1,60 @@
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from social_network.post import likes
+from social_network.post.models import Post
+
+logger = logging.getLogger()
+
+
+class Command(BaseCommand):
+    help = ('Measure post creation and like throughput of the configured database. '
+            'Run it with --settings of the profile to compare. Benchmark data is removed afterwards')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=500)
+        parser.add_argument('--fans', type=int, default=20, help='Number of users liking every post')
+        parser.add_argument('--concurrency', type=int, default=8, help='Number of parallel writers')
+
+    def handle(self, *args, **options):
+        prefix = f'benchmark-{uuid.uuid4().hex[:8]}'
+        author = User.objects.create_user(f'{prefix}-author')
+        fans = [User.objects.create_user(f'{prefix}-fan-{i}') for i in range(options['fans'])]
+        try:
+            post_ids, posts_rate = self.measure(
+                lambda i: Post.objects.create(creator=author, data=f'{prefix} {i}').pk,
+                range(options['posts']), options['concurrency'])
+            likes_to_do = [(post_id, fan.pk) for post_id in post_ids for fan in fans]
+            _, likes_rate = self.measure(lambda like: likes.like_post(like[0], author.pk, like[1]),
+                                         likes_to_do, options['concurrency'])
+        finally:
+            Post.objects.filter(creator=author).delete()
+            User.objects.filter(username__startswith=prefix).delete()
+        database = settings.DATABASES['default']
+        self.stdout.write(f'{database["ENGINE"]} {database["NAME"]} with {options["concurrency"]} writers')
+        self.stdout.write(f'posts created: {posts_rate:.1f}/s')
+        self.stdout.write(f'likes: {likes_rate:.1f}/s')
+
+    @staticmethod
+    def measure(func, items, concurrency):
+        """Calls func for every item by `concurrency` threads
+        :returns
+            tuple - list of results and number of calls per second"""
+        def call(item):
+            try:
+                return func(item)
+            finally:
+                connection.close()
+
+        items = list(items)
+        started_at = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(call, items))
+        return results, len(items) / (time.monotonic() - started_at)
@@ -0,0 +1,45 @@
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.models import User
+
+from social_network.post.management.commands import benchmark_db
+from social_network.post.models import Task
+from social_network.post.serializers import UserSerializer
+
+
+class Command(benchmark_db.Command):
+    help = ('Measure signup and login (token issuance) throughput with the configured password hasher. '
+            'Run it with --settings of the profile to compare. Benchmark users are removed afterwards')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8, help='Number of parallel requests')
+
+    def handle(self, *args, **options):
+        prefix = f'benchmark-{uuid.uuid4().hex[:8]}'
+        password = uuid.uuid4().hex
+        usernames = [f'{prefix}-{i}' for i in range(options['users'])]
+        try:
+            _, signups_rate = self.measure(lambda username: self.sign_up(username, password),
+                                           usernames, options['concurrency'])
+            _, logins_rate = self.measure(lambda username: authenticate(username=username, password=password),
+                                          usernames, options['concurrency'])
+        finally:
+            user_ids = list(User.objects.filter(username__startswith=prefix).values_list('pk', flat=True))
+            Task.objects.filter(kwargs__user_id__in=user_ids).delete()
+            User.objects.filter(pk__in=user_ids).delete()
+        hasher = get_hasher('default')
+        iterations = getattr(hasher, 'iterations', '-')
+        self.stdout.write(f'{hasher.algorithm} with {iterations} iterations, '
+                          f'{settings.PASSWORD_HASHING_WORKERS} hashing workers, {options["concurrency"]} clients')
+        self.stdout.write(f'signups: {signups_rate:.1f}/s')
+        self.stdout.write(f'logins: {logins_rate:.1f}/s')
+
+    @staticmethod
+    def sign_up(username, password):
+        serializer = UserSerializer(data={'username': username, 'password': password})
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
@@ -0,0 +1,70 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from social_network.post.utils import RateLimiter, fetch_name_data
+
+logger = logging.getLogger()
+
+
+class Command(BaseCommand):
+    help = 'Populate first and last names of users that miss them with clearbit data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=8, help='Number of parallel clearbit requests')
+        parser.add_argument('--rate', type=float, default=10, help='Max number of clearbit requests per second')
+        parser.add_argument('--state-file', help='File to store id of the last processed user. '
+                                                 'Next run continues after this user')
+
+    def handle(self, *args, **options):
+        state_file = options['state_file']
+        last_id = self.read_last_id(state_file)
+        rate_limiter = RateLimiter(options['rate'])
+        users = User.objects.filter(Q(first_name='') | Q(last_name=''), pk__gt=last_id).exclude(email='').\
+            order_by('pk').only('pk', 'email', 'first_name', 'last_name').iterator(chunk_size=options['batch_size'])
+        enriched = 0
+
+        def lookup(user):
+            rate_limiter.wait()
+            try:
+                return user, fetch_name_data(user.email)
+            except Exception:
+                logger.exception(f'Clearbit data can not be fetched for user {user.pk}')
+                return user, {}
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            while True:
+                batch = list(islice(users, options['batch_size']))
+                if not batch:
+                    break
+                updated = []
+                for user, name_data in executor.map(lookup, batch):
+                    if not name_data:
+                        continue
+                    user.first_name = name_data['first_name'] or ''
+                    user.last_name = name_data['last_name'] or ''
+                    updated.append(user)
+                User.objects.bulk_update(updated, ['first_name', 'last_name'])
+                enriched += len(updated)
+                self.write_last_id(state_file, batch[-1].pk)
+                logger.info(f'Users up to {batch[-1].pk} are processed. {enriched} users are enriched')
+
+    @staticmethod
+    def read_last_id(state_file):
+        if not state_file or not os.path.isfile(state_file):
+            return 0
+        with open(state_file) as file:
+            return int(file.read().strip() or 0)
+
+    @staticmethod
+    def write_last_id(state_file, last_id):
+        if not state_file:
+            return
+        with open(state_file, 'w') as file:
+            file.write(str(last_id))
@@ -0,0 +1,30 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from social_network.post import export
+
+
+class Command(BaseCommand):
+    help = 'Export users, posts and likes as NDJSON for analytics and backups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', nargs='?', default='-', help='File to write to, stdout by default')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Number of rows fetched at once')
+
+    def handle(self, *args, **options):
+        lines = export.iter_lines(options['chunk_size'])
+        if options['gzip']:
+            lines = export.gzip_stream(lines)
+        if options['output'] == '-':
+            self.write(sys.stdout.buffer, lines)
+            return
+        with open(options['output'], 'wb') as output:
+            self.write(output, lines)
+
+    @staticmethod
+    def write(output, chunks):
+        for chunk in chunks:
+            output.write(chunk)
+        output.flush()
@@ -0,0 +1,191 @@
+import gzip
+import json
+import logging
+import random
+import sys
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from social_network.post.models import Like, Post
+
+logger = logging.getLogger()
+
+MODELS = {'user': User, 'post': Post, 'like': Like}
+
+
+class Command(BaseCommand):
+    help = ('Load users, posts and likes from NDJSON written by export_ndjson or generate synthetic ones. '
+            'Counters are recalculated afterwards. Every batch is committed, an interrupted import is resumed by '
+            'running it again with --skip-existing')
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', nargs='?', help='NDJSON file, gzip compressed if ends with .gz, "-" for stdin')
+        parser.add_argument('--generate', type=int, default=0, metavar='USERS',
+                            help='Generate the number of users with posts and likes instead of reading input')
+        parser.add_argument('--posts-per-user', type=int, default=10)
+        parser.add_argument('--likes-per-user', type=int, default=50)
+        parser.add_argument('--seed', type=int, help='Seed of generated likes')
+        parser.add_argument('--password', help='Password of all loaded users. Users can not log in by default')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Number of rows inserted by a transaction')
+        parser.add_argument('--skip-existing', action='store_true',
+                            help='Skip records which conflict with existing rows instead of failing')
+
+    def handle(self, *args, **options):
+        if bool(options['input']) == bool(options['generate']):
+            raise CommandError('Either input or --generate must be provided')
+        if options['generate']:
+            records = self.generate(options['generate'], options['posts_per_user'], options['likes_per_user'],
+                                    random.Random(options['seed']))
+            loaded = self.load(records, options)
+        else:
+            with self.open_input(options['input']) as lines:
+                loaded = self.load((json.loads(line) for line in lines if line.strip()), options)
+        self.reset_sequences()
+        logger.info(f'Loaded {loaded["user"]} users, {loaded["post"]} posts, {loaded["like"]} likes')
+        call_command('backfill_counters', batch_size=options['batch_size'])
+
+    @staticmethod
+    @contextmanager
+    def open_input(path):
+        if path == '-':
+            yield sys.stdin.buffer
+        elif path.endswith('.gz'):
+            with gzip.open(path) as lines:
+                yield lines
+        else:
+            with open(path, 'rb') as lines:
+                yield lines
+
+    def load(self, records, options):
+        """Inserts records in batches. Pending batches are inserted once the type of records changes, so records are
+        inserted after the records they reference
+        :raises
+            CommandError - if a record is invalid or conflicts with existing rows
+        :returns
+            dict - record type to number of inserted records"""
+        # Password is hashed once for all users
+        password = make_password(options['password'])
+        batches = {record_type: [] for record_type in MODELS}
+        loaded = dict.fromkeys(MODELS, 0)
+        last_type = None
+        line_number = 0
+        for line_number, record in enumerate(records, start=1):
+            record_type = record.pop('type', None)
+            if record_type not in MODELS:
+                raise CommandError(f'Record {line_number} has unknown type {record_type}')
+            if record_type != last_type:
+                self.flush(batches, loaded, line_number - 1, options['skip_existing'])
+                last_type = record_type
+            instance = self.build(MODELS[record_type], record, line_number)
+            if record_type == 'user':
+                instance.password = password
+            batches[record_type].append(instance)
+            if len(batches[record_type]) >= options['batch_size']:
+                self.flush(batches, loaded, line_number, options['skip_existing'])
+        self.flush(batches, loaded, line_number, options['skip_existing'])
+        return loaded
+
+    @staticmethod
+    def build(model, record, line_number):
+        """:raises
+            CommandError - if the record has fields the model does not have or invalid values
+        :returns
+            Model - unsaved instance of the record"""
+        fields = {field.attname for field in model._meta.concrete_fields}
+        unknown = sorted(set(record) - fields)
+        if unknown:
+            raise CommandError(f'Record {line_number} has unknown fields {", ".join(unknown)}')
+        try:
+            instance = model(**record)
+            for field in model._meta.concrete_fields:
+                if field.attname in record:
+                    setattr(instance, field.attname, field.to_python(record[field.attname]))
+        except (TypeError, ValueError, ValidationError) as error:
+            raise CommandError(f'Record {line_number} is invalid: {error}')
+        for field in model._meta.concrete_fields:
+            # Records are inserted without pre_save, times of records that have none are set here
+            if getattr(field, 'auto_now_add', False) and getattr(instance, field.attname) is None:
+                setattr(instance, field.attname, timezone.now())
+        return instance
+
+    @staticmethod
+    def flush(batches, loaded, line_number, skip_existing):
+        """:raises
+            CommandError - if a batch conflicts with existing rows, previous batches stay committed"""
+        for record_type, batch in batches.items():
+            if not batch:
+                continue
+            try:
+                with transaction.atomic():
+                    inserted = Command.insert(MODELS[record_type], batch, skip_existing)
+            except IntegrityError as error:
+                raise CommandError(f'{record_type} records {line_number - len(batch) + 1}-{line_number} are not loaded '
+                                   f'({error}), {sum(loaded.values())} records before them are loaded. '
+                                   f'Run again with --skip-existing to resume')
+            loaded[record_type] += inserted
+            skipped = f', {len(batch) - inserted} existing are skipped' if inserted < len(batch) else ''
+            logger.info(f'{loaded[record_type]} {record_type} records are loaded{skipped}')
+            batch.clear()
+
+    @staticmethod
+    def insert(model, batch, skip_existing):
+        """Inserts the batch with values of the records. Values are inserted raw, as by loaddata, so pre_save does not
+        replace imported times of auto_now_add fields
+        :returns
+            int - number of inserted rows, existing rows skipped with skip_existing are not counted. Rows are
+            identified by ids, likes by post and user"""
+        if model is Like:
+            rows = Like.objects.filter(post_id__in={like.post_id for like in batch},
+                                       user_id__in={like.user_id for like in batch})
+        else:
+            rows = model.objects.filter(pk__in=[instance.pk for instance in batch])
+        existing = rows.count() if skip_existing else 0
+        opts = model._meta
+        for with_pk in (True, False):
+            instances = [instance for instance in batch if (instance.pk is not None) == with_pk]
+            fields = [field for field in opts.concrete_fields if with_pk or field is not opts.auto_field]
+            size = connection.ops.bulk_batch_size(fields, instances) or 1
+            for start in range(0, len(instances), size):
+                model._base_manager._insert(instances[start:start + size], fields=fields, raw=True,
+                                            ignore_conflicts=skip_existing)
+        return rows.count() - existing if skip_existing else len(batch)
+
+    @staticmethod
+    def generate(users, posts_per_user, likes_per_user, rand):
+        """Yields records of users with posts. Every user likes random generated posts. Ids continue after existing
+        rows, so generated data could be added to an existing database"""
+        first_user_id = (User.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        first_post_id = (Post.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+        user_ids = range(first_user_id, first_user_id + users)
+        post_ids = range(first_post_id, first_post_id + users * posts_per_user)
+        # Users join one by one and then write posts one by one. Equal timestamps would make cursor pagination skip
+        # them by offset
+        started_at = timezone.now() - timedelta(seconds=len(user_ids) + len(post_ids))
+        for index, user_id in enumerate(user_ids):
+            yield {'type': 'user', 'id': user_id, 'username': f'user-{user_id}', 'email': f'user-{user_id}@example.com',
+                   'date_joined': started_at + timedelta(seconds=index)}
+        posts_started_at = started_at + timedelta(seconds=len(user_ids))
+        for index, post_id in enumerate(post_ids):
+            yield {'type': 'post', 'id': post_id, 'creator_id': user_ids[index // posts_per_user],
+                   'data': f'post {post_id}', 'created_at': posts_started_at + timedelta(seconds=index)}
+        liked_at = timezone.now()
+        for user_id in user_ids:
+            for post_id in sorted(rand.sample(post_ids, min(likes_per_user, len(post_ids)))):
+                yield {'type': 'like', 'post_id': post_id, 'user_id': user_id, 'liked_at': liked_at}
+
+    @staticmethod
+    def reset_sequences():
+        """Explicit ids do not advance id sequences (PostgreSQL), next rows would get ids of the loaded rows"""
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [User, Post, Like]):
+                cursor.execute(sql)
@@ -0,0 +1,27 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from social_network.post.tasks import process_tasks
+
+logger = logging.getLogger()
+
+
+class Command(BaseCommand):
+    help = 'Execute background tasks until the queue is drained'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, help='Number of parallel workers. '
+                                                            'TASK_QUEUE_CONCURRENCY setting is used by default')
+        parser.add_argument('--limit', type=int, help='Max number of tasks to execute')
+        parser.add_argument('--poll', type=float, help='Keep waiting for new tasks, checking the queue every '
+                                                       'POLL seconds once it is drained')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_tasks(concurrency=options['concurrency'], limit=options['limit'])
+            logger.info(f'{processed} tasks are processed')
+            if not options['poll']:
+                return
+            time.sleep(options['poll'])
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class AddIndexOnline(migrations.AddIndex):
+    """Creates the index with CREATE INDEX CONCURRENTLY on PostgreSQL, so writes to the table are not blocked while
+    the index is built. Other databases create the index as AddIndex does. Migration using it must not be atomic.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.execute(self.index.create_sql(model, schema_editor, concurrently=True))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.execute(self.index.remove_sql(model, schema_editor, concurrently=True))
@@ -0,0 +1,24 @@
+# Generated by Django 3.1.5 on 2026-10-17 18:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('post', '0003_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['created_at', 'id'], name='post_created_at_id_idx'),
+        ),
+        # auth.User is not owned by the project, index for users cursor pagination is created manually
+        migrations.RunSQL(
+            sql='CREATE INDEX auth_user_date_joined_id_idx ON auth_user (date_joined, id)',
+            reverse_sql='DROP INDEX auth_user_date_joined_id_idx',
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.1.5 on 2026-10-17 18:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_unliked_authors(apps, schema_editor):
+    Profile = apps.get_model('post', 'Profile')
+    UnlikedAuthor = apps.get_model('post', 'UnlikedAuthor')
+    user_ids = Profile.objects.filter(post_count__gte=1, liked_post_count=0).values_list('pk', flat=True)
+    UnlikedAuthor.objects.bulk_create([UnlikedAuthor(user_id=user_id) for user_id in user_ids.iterator()],
+                                      batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('post', '0005_task_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnlikedAuthor',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unliked_author', serialize=False, to='auth.user')),
+                ('since', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='profile',
+            name='profile_least_favorite_idx',
+        ),
+        migrations.AddIndex(
+            model_name='unlikedauthor',
+            index=models.Index(fields=['since', 'user'], name='unliked_author_since_idx'),
+        ),
+        migrations.RunPython(populate_unliked_authors, migrations.RunPython.noop),
+    ]
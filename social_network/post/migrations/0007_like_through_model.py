@@ -0,0 +1,59 @@
+# Generated by Django 3.1.5 on 2026-10-17 18:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from social_network.post.migration_operations import AddIndexOnline
+
+
+class Migration(migrations.Migration):
+    # Indexes are created concurrently on PostgreSQL which is not allowed inside a transaction
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('post', '0006_unliked_authors'),
+    ]
+
+    operations = [
+        # Like uses the existing table of the implicit many to many relation. Columns and the unique
+        # (post_id, user_id) constraint already exist, so only the migration state is changed
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Like',
+                    fields=[
+                        ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='post.post')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'post_post_fans',
+                        'unique_together': {('post', 'user')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='post',
+                    name='fans',
+                    field=models.ManyToManyField(blank=True, related_name='preferences', through='post.Like', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        # Existing likes get the time of the migration. Column with a constant default is added without rewriting
+        # the table on PostgreSQL 11+
+        migrations.AddField(
+            model_name='like',
+            name='liked_at',
+            field=models.DateTimeField(auto_now_add=True),
+            preserve_default=False,
+        ),
+        AddIndexOnline(
+            model_name='post',
+            index=models.Index(fields=['creator', 'created_at'], name='post_creator_created_at_idx'),
+        ),
+        AddIndexOnline(
+            model_name='like',
+            index=models.Index(fields=['user', 'liked_at'], name='like_user_liked_at_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.1.5 on 2026-10-17 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0008_feed_entries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='posts_modified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='posts_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
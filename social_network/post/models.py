@@ -1,9 +1,114 @@
 from django.contrib.auth.models import User
 from django.db import models
+from django.utils import timezone
 
 
 class Post(models.Model):
     data = models.TextField()
     creator = models.ForeignKey(User, blank=False, null=False, on_delete=models.DO_NOTHING, related_name='posts')
     created_at = models.DateTimeField(auto_now_add=True)
-    fans = models.ManyToManyField(User, related_name='preferences', null=True, blank=True)
+    fans = models.ManyToManyField(User, through='Like', related_name='preferences', blank=True)
+    # Denormalized number of fans. Maintained by social_network.post.counters
+    fan_count = models.PositiveIntegerField(default=0)
+
+    counter_fields = ('fan_count',)
+
+    class Meta:
+        indexes = [
+            # Serves cursor pagination ordered by (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='post_created_at_id_idx'),
+            # Serves posts of a creator (?creator=<id>) in cursor pagination order
+            models.Index(fields=['creator', 'created_at'], name='post_creator_created_at_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Counters are changed with atomic updates only. Saving an outdated instance must not overwrite them
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name not in self.counter_fields]
+        super().save(*args, **kwargs)
+
+
+class Like(models.Model):
+    """Fan of a post. Uses the table created for the implicit many to many relation"""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    liked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'post_post_fans'
+        unique_together = [('post', 'user')]
+        indexes = [
+            # Serves posts liked by a user, latest first
+            models.Index(fields=['user', 'liked_at'], name='like_user_liked_at_idx'),
+        ]
+
+
+class FeedEntry(models.Model):
+    """Post in the feed of a user. Written when the post is created for users that liked posts of its creator
+    (fan-out on write), so a feed page is a range read of the user's entries
+    created_at - copy of the post created_at, feed is ordered by it
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='feed_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='feed_entries')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = [('user', 'post')]
+        indexes = [
+            # Serves feed cursor pagination
+            models.Index(fields=['user', 'created_at', 'post'], name='feed_entry_user_created_idx'),
+        ]
+
+
+class Profile(models.Model):
+    """Per user counters maintained alongside posts and likes.
+    post_count - number of posts created by the user
+    liked_post_count - number of posts created by the user that have at least one fan
+    posts_version - changed with every change of the user posts or their fans, identifies posts in ETags
+    posts_modified_at - time of the last posts_version change
+    """
+    user = models.OneToOneField(User, primary_key=True, on_delete=models.CASCADE, related_name='profile')
+    post_count = models.PositiveIntegerField(default=0)
+    liked_post_count = models.PositiveIntegerField(default=0)
+    posts_version = models.PositiveIntegerField(default=0)
+    posts_modified_at = models.DateTimeField(null=True, blank=True)
+
+
+class UnlikedAuthor(models.Model):
+    """Materialized list of users that have posts and none of the posts is liked. Served by least_favorite
+    since - when the user became an unliked author
+    """
+    user = models.OneToOneField(User, primary_key=True, on_delete=models.CASCADE, related_name='unliked_author')
+    since = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Serves least_favorite cursor pagination
+            models.Index(fields=['since', 'user'], name='unliked_author_since_idx'),
+        ]
+
+
+class Task(models.Model):
+    """Persistent background task. Executed by process_tasks management command
+    handler - dotted path to a function that is called with kwargs
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (FAILED, 'Failed')]
+
+    handler = models.CharField(max_length=255)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=36, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='task_due_idx'),
+        ]
@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedCursorPagination(CursorPagination):
+    """Cursor pagination, newest first. The cursor position is created_at only, rows with the same created_at as
+    the position are skipped by an offset, so pages cost more when many rows share a timestamp. id keeps the order of
+    such rows stable and together with created_at is served by the composite index"""
+    ordering = ('-created_at', '-id')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class DateJoinedCursorPagination(CreatedCursorPagination):
+    ordering = ('-date_joined', '-id')
+
+
+class UnlikedSinceCursorPagination(CreatedCursorPagination):
+    ordering = ('-since', '-user_id')
+
+
+class FeedCursorPagination(CreatedCursorPagination):
+    ordering = ('-created_at', '-post_id')
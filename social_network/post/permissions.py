@@ -0,0 +1,12 @@
+from django.contrib.auth.models import User
+from rest_framework import permissions
+
+
+class IsAdminUser(permissions.IsAdminUser):
+    """Allows access to active staff users only. Staff status is checked in the database, is_staff claim of a token
+    could be outdated until the token expires"""
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and
+                    User.objects.filter(pk=user.pk, is_staff=True, is_active=True).exists())
@@ -0,0 +1,8 @@
+from rest_framework.renderers import JSONRenderer
+
+
+class NDJSONRenderer(JSONRenderer):
+    """Accepts requests for newline delimited JSON. Streamed content is produced by the view, other responses
+    (e.g. errors) are rendered as JSON"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
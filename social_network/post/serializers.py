@@ -1,13 +1,16 @@
-import threading
-
+from django.conf import settings
 from django.contrib.auth.models import User
 from rest_framework import serializers
 
+from social_network.post.fields import CachedHyperlinkedIdentityField, CachedHyperlinkedRelatedField
+from social_network.post.likes import get_fan_samples
 from social_network.post.models import Post
-from social_network.post.utils import fetch_name_data, verify_email, populate_clearbit_user_data_async
+from social_network.post import utils
 
 
 class UserSerializer(serializers.HyperlinkedModelSerializer):
+    serializer_related_field = CachedHyperlinkedRelatedField
+    serializer_url_field = CachedHyperlinkedIdentityField
     password = serializers.CharField(max_length=128, write_only=True)
 
     class Meta:
@@ -15,18 +18,76 @@ class UserSerializer(serializers.HyperlinkedModelSerializer):
         fields = ['url', 'username', 'email', 'first_name', 'last_name', 'password', 'id']
 
     def validate_email(self, email):
-        verify_email(email)
+        # Email could be already verified by the async signup view
+        if email != self.context.get('verified_email'):
+            utils.verify_email(email)
         return email
 
     def create(self, validated_data):
-        user = super().create(validated_data)
-        user.set_password(validated_data['password'])
+        # Password is hashed before the user is inserted, so the user is written once. It could be already hashed by
+        # the caller, see async users_signup
+        password = validated_data.pop('password')
+        hashed_password = validated_data.pop('hashed_password', None)
+        user = User(**validated_data)
+        if hashed_password:
+            user.password = hashed_password
+        else:
+            user.set_password(password)
         user.save()
-        populate_clearbit_user_data_async(user.pk, user.email)
+        utils.populate_clearbit_user_data_async(user.pk, user.email)
         return user
 
 
 class PostSerializer(serializers.HyperlinkedModelSerializer):
+    serializer_related_field = CachedHyperlinkedRelatedField
+    serializer_url_field = CachedHyperlinkedIdentityField
+
+    class Meta:
+        model = Post
+        fields = ['data', 'creator', 'created_at', 'fans', 'url', 'id']
+
+    def to_internal_value(self, data):
+        # Fans through Like model are read only, they are rejected instead of being silently ignored
+        if isinstance(data, dict) and 'fans' in data:
+            raise serializers.ValidationError({'fans': 'Fans are changed by like and unlike actions only'})
+        return super().to_internal_value(data)
+
+
+class PostSummaryListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        posts = list(data)
+        sample_size = self.context.get('fan_sample_size', 0)
+        self.context['fan_samples'] = get_fan_samples([post.pk for post in posts], sample_size)
+        return super().to_representation(posts)
+
+
+class PostSummarySerializer(PostSerializer):
+    """Compact representation of a post. Fans are represented by their number and optional sample of fan ids
+    instead of the list of all fan urls"""
+    liked_by_me = serializers.BooleanField(read_only=True)
+    fan_sample = serializers.SerializerMethodField()
+
     class Meta:
         model = Post
-        fields = ['data', 'creator', 'created_at', 'fans', 'url']
+        fields = ['data', 'creator', 'created_at', 'url', 'id', 'fan_count', 'liked_by_me', 'fan_sample']
+        read_only_fields = ['fan_count']
+        list_serializer_class = PostSummaryListSerializer
+
+    def get_fan_sample(self, post):
+        sample_size = self.context.get('fan_sample_size', 0)
+        if not sample_size:
+            return None
+        if 'fan_samples' not in self.context:
+            self.context['fan_samples'] = get_fan_samples([post.pk], sample_size)
+        return self.context['fan_samples'].get(post.pk, [])
+
+
+class PostBatchLikeSerializer(serializers.Serializer):
+    posts = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_posts(self, posts):
+        if len(posts) > settings.POSTS_BATCH_LIKE_MAX_BATCH:
+            raise serializers.ValidationError(f'Up to {settings.POSTS_BATCH_LIKE_MAX_BATCH} posts could be liked '
+                                              f'at once')
+        # Duplicates are removed keeping the order
+        return list(dict.fromkeys(posts))
@@ -0,0 +1,105 @@
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from social_network.post import authentication, counters, feed, least_favorite
+from social_network.post.models import Like, Post, Profile
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, **kwargs):
+    if created:
+        Profile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    authentication.user_cache.delete(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(counters.profile_counters_changed)
+def invalidate_least_favorite(sender, created=False, **kwargs):
+    # New users have no posts, so they are not in least_favorite results
+    if created:
+        return
+    # Invalidated after commit, otherwise results could be cached again before the change is visible
+    transaction.on_commit(least_favorite.invalidate)
+
+
+@receiver(post_save, sender=Post)
+def count_created_post(sender, instance, created, **kwargs):
+    if created:
+        counters.post_created(instance.creator_id)
+
+
+@receiver(pre_save, sender=Post)
+def remember_creator(sender, instance, **kwargs):
+    # Creator could be changed by update, counters of the previous creator are moved after save
+    if not instance._state.adding:
+        instance._saved_creator_id = Post.objects.filter(pk=instance.pk).values_list('creator_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def count_updated_post(sender, instance, created, **kwargs):
+    if created:
+        return
+    saved_creator_id = getattr(instance, '_saved_creator_id', None)
+    if saved_creator_id is None or saved_creator_id == instance.creator_id:
+        counters.posts_modified(instance.creator_id)
+        return
+    fan_count = Post.objects.filter(pk=instance.pk).values_list('fan_count', flat=True).first()
+    counters.post_moved(saved_creator_id, instance.creator_id, fan_count)
+
+
+@receiver(post_save, sender=Post)
+def add_to_feeds(sender, instance, created, **kwargs):
+    if created:
+        feed.fan_out_async(instance.creator_id, [instance])
+
+
+@receiver(pre_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    # In-memory instance could be outdated, fan_count is taken from the database
+    fan_count = Post.objects.filter(pk=instance.pk).values_list('fan_count', flat=True).first()
+    counters.post_deleted(instance.creator_id, fan_count)
+
+
+@receiver(pre_delete, sender=User)
+def count_deleted_fan(sender, instance, **kwargs):
+    # Likes of the user are deleted by cascade, which does not send m2m_changed
+    for post_id, creator_id in Like.objects.filter(user=instance).values_list('post_id', 'post__creator_id'):
+        counters.post_unliked(post_id, creator_id)
+
+
+@receiver(m2m_changed, sender=Like)
+def count_fans(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keeps counters in sync when fans are changed through the ORM, e.g. post.fans.add(user)
+    post_add receives only newly added ids. Removal is counted before the rows are deleted, because pk_set of
+    remove contains all requested ids even if some of them were not fans and clear does not provide ids at all.
+    """
+    if action not in ('post_add', 'pre_remove', 'pre_clear'):
+        return
+    links = sender.objects.filter(user=instance) if reverse else sender.objects.filter(post=instance)
+    if pk_set is not None:
+        links = links.filter(**{'post__in' if reverse else 'user__in': pk_set})
+    fans_per_post = Counter(links.values_list('post_id', 'post__creator_id'))
+    update = counters.post_liked if action == 'post_add' else counters.post_unliked
+    for (post_id, creator_id), count in fans_per_post.items():
+        update(post_id, creator_id, count)
@@ -0,0 +1,86 @@
+"""Database backed queue of background tasks.
+
+Tasks survive restarts of the application and are executed by a bounded pool of workers started with
+"python manage.py process_tasks", so a burst of requests does not spawn a thread per task.
+"""
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from logging import getLogger
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from social_network.post.models import Task
+
+logger = getLogger()
+
+
+def enqueue(func, **kwargs):
+    """Stores a call of the module level function to be executed by a worker. kwargs must be JSON serializable"""
+    return Task.objects.create(handler=f'{func.__module__}.{func.__qualname__}', kwargs=kwargs)
+
+
+def claim_tasks(limit):
+    """Locks up to `limit` due tasks for the current worker. Tasks locked by lost workers are claimed again unless
+    they have used all attempts, those are failed"""
+    now = timezone.now()
+    token = str(uuid.uuid4())
+    lock_expired = Q(status=Task.RUNNING, locked_at__lt=now - timedelta(seconds=settings.TASK_QUEUE_LOCK_TIMEOUT))
+    exhausted = Q(attempts__gte=settings.TASK_QUEUE_MAX_ATTEMPTS)
+    Task.objects.filter(lock_expired & exhausted).update(status=Task.FAILED, last_error='Lock timeout expired',
+                                                         locked_by='', locked_at=None)
+    due = Q(status=Task.PENDING, run_after__lte=now) | (lock_expired & ~exhausted)
+    ids = list(Task.objects.filter(due).order_by('run_after').values_list('pk', flat=True)[:limit])
+    # Status is checked once again, so a task claimed concurrently by another worker is skipped
+    Task.objects.filter(due, pk__in=ids).update(status=Task.RUNNING, locked_by=token, locked_at=now,
+                                                attempts=F('attempts') + 1)
+    return list(Task.objects.filter(locked_by=token, status=Task.RUNNING))
+
+
+def run_task(task):
+    try:
+        import_string(task.handler)(**task.kwargs)
+    except Exception as e:
+        retry(task, e)
+    else:
+        Task.objects.filter(pk=task.pk, locked_by=task.locked_by).delete()
+
+
+def run_task_in_worker(task):
+    try:
+        run_task(task)
+    finally:
+        # Each worker thread has its own database connection
+        connection.close()
+
+
+def retry(task, error):
+    logger.exception(f'Task {task.handler} #{task.pk} failed. Attempt {task.attempts}')
+    changes = {'status': Task.PENDING, 'last_error': repr(error), 'locked_by': '', 'locked_at': None}
+    if task.attempts >= settings.TASK_QUEUE_MAX_ATTEMPTS:
+        changes['status'] = Task.FAILED
+    else:
+        delay = settings.TASK_QUEUE_RETRY_BACKOFF * 2 ** (task.attempts - 1)
+        changes['run_after'] = timezone.now() + timedelta(seconds=delay)
+    Task.objects.filter(pk=task.pk, locked_by=task.locked_by).update(**changes)
+
+
+def process_tasks(concurrency=None, limit=None):
+    """Executes due tasks until there are no more of them or `limit` tasks are executed
+    :returns
+        int - number of executed tasks"""
+    concurrency = concurrency or settings.TASK_QUEUE_CONCURRENCY
+    processed = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while limit is None or processed < limit:
+            batch_size = concurrency if limit is None else min(concurrency, limit - processed)
+            tasks = claim_tasks(batch_size)
+            if not tasks:
+                break
+            list(executor.map(run_task_in_worker, tasks))
+            processed += len(tasks)
+    return processed
@@ -0,0 +1,106 @@
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from social_network.post.cache import get_cache
+from social_network.post.constants import HunterCodes
+from social_network.post.tests import utils as test_utils
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_email_verification_cache():
+    get_cache(settings.EMAIL_VERIFICATION_CACHE).clear()
+
+
+@pytest.fixture
+def client(author):
+    return test_utils.get_client(author)
+
+
+def test_post_list_requires_token():
+    # When: Posts are requested without token
+    resp = APIClient().get(reverse('async-post-list'))
+    # Then: 401 is returned
+    assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+    assert 'WWW-Authenticate' in resp
+
+
+def test_post_list_and_detail(author, client):
+    # Given: Posts of the author
+    first, second = test_utils.create_post_for_user(author), test_utils.create_post_for_user(author)
+    # When: Posts are requested from async views
+    list_resp = client.get(reverse('async-post-list'), {'creator': author.pk, 'fans': 'summary'})
+    detail_resp = client.get(reverse('async-post-detail', args=(first.pk,)))
+    # Then: The same data as from DRF views is returned
+    assert list_resp.status_code == status.HTTP_200_OK
+    assert [post['id'] for post in list_resp.json()['results']] == [second.pk, first.pk]
+    assert detail_resp.json() == client.get(reverse('post-detail', args=(first.pk,))).json()
+
+
+def test_post_detail_not_found(client):
+    # When: Not existing post is requested
+    resp = client.get(reverse('async-post-detail', args=(1000,)))
+    # Then: 404 is returned
+    assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_least_favorite_is_served_from_cache(author, client):
+    # Given: Cached least_favorite result with the author of not liked post
+    test_utils.create_post_for_user(author)
+    assert [user['username'] for user in client.get(reverse('async-user-least-favorite')).json()['results']] == \
+        ['john']
+    # When: least_favorite is requested once again
+    with mock.patch('social_network.post.async_views.call_view') as call_view:
+        resp = client.get(reverse('async-user-least-favorite'))
+    # Then: Cached result is returned without calling the DRF view
+    assert [user['username'] for user in resp.json()['results']] == ['john']
+    call_view.assert_not_called()
+
+
+@mock.patch('social_network.post.utils.hunter')
+@mock.patch('social_network.post.utils.populate_clearbit_user_data_async', mock.Mock())
+def test_signup_verifies_email_once(hunter_mock):
+    # Given: Hunter reports deliverable email
+    hunter_mock.email_verifier = mock.Mock(return_value={'result': HunterCodes.DELIVERABLE.value})
+    payload = {'username': 'HarryPovar', 'password': 'harrypassword', 'email': 'harry@hogwarts.com'}
+    # When: User signs up with async view
+    resp = APIClient().post(reverse('async-user-signup'), payload, format='json')
+    # Then: The user is created and hunter is requested once
+    assert resp.status_code == status.HTTP_201_CREATED
+    assert resp.json()['username'] == 'HarryPovar'
+    assert User.objects.get(username='HarryPovar').check_password('harrypassword')
+    hunter_mock.email_verifier.assert_called_once_with('harry@hogwarts.com')
+
+
+@mock.patch('social_network.post.utils.hunter')
+@mock.patch('social_network.post.utils.populate_clearbit_user_data_async', mock.Mock())
+def test_signup_hashes_password_outside_of_database_thread(hunter_mock):
+    # Given: Hunter reports deliverable email
+    hunter_mock.email_verifier = mock.Mock(return_value={'result': HunterCodes.DELIVERABLE.value})
+    payload = {'username': 'HarryPovar', 'password': 'harrypassword', 'email': 'harry@hogwarts.com'}
+    # When: User signs up with async view
+    with mock.patch.object(User, 'set_password') as set_password:
+        resp = APIClient().post(reverse('async-user-signup'), payload, format='json')
+    # Then: The user is inserted with the password hashed before
+    assert resp.status_code == status.HTTP_201_CREATED
+    set_password.assert_not_called()
+    assert User.objects.get(username='HarryPovar').check_password('harrypassword')
+
+
+@mock.patch('social_network.post.utils.hunter')
+def test_signup_with_unreachable_email(hunter_mock):
+    # Given: Hunter reports undeliverable email
+    hunter_mock.email_verifier = mock.Mock(return_value={'result': HunterCodes.UNDELIVERABLE.value})
+    payload = {'username': 'HarryPovar', 'password': 'harrypassword', 'email': 'poc@poc.com'}
+    # When: User signs up with async view
+    resp = APIClient().post(reverse('async-user-signup'), payload, format='json')
+    # Then: 400 is returned and no user is created
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert not User.objects.filter(username='HarryPovar').exists()
@@ -0,0 +1,127 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from social_network.post import authentication
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    authentication.user_cache.clear()
+
+
+@pytest.fixture
+def user(author):
+    return author
+
+
+def obtain_tokens(username='john', password='johnpassword'):
+    resp = APIClient().post(reverse('token_obtain_pair'), {'username': username, 'password': password})
+    assert resp.status_code == status.HTTP_200_OK
+    return resp.json()
+
+
+def count_user_queries(access_token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    with CaptureQueriesContext(connection) as queries:
+        resp = client.get(reverse('post-list'))
+    assert resp.status_code == status.HTTP_200_OK
+    return sum('FROM "auth_user"' in query['sql'] for query in queries)
+
+
+def test_token_with_claims_is_authenticated_without_user_query(user):
+    # Given: Token issued by the api and token issued without user claims
+    access_token = obtain_tokens()['access']
+    # When: Posts are requested with the tokens
+    # Then: User is queried only for the token without claims
+    assert count_user_queries(access_token) == 0
+    assert count_user_queries(RefreshToken.for_user(user).access_token) == 1
+
+
+def test_refreshed_token_keeps_claims(user):
+    # When: Access token is refreshed
+    refresh_token = obtain_tokens()['refresh']
+    resp = APIClient().post(reverse('token_refresh'), {'refresh': refresh_token})
+    # Then: New access token has user claims
+    token = AccessToken(resp.json()['access'])
+    assert (token['username'], token['is_active'], token['is_staff']) == ('john', True, False)
+
+
+def test_inactive_user_claim_is_rejected(user):
+    # Given: Token of the user with inactive claim
+    token = authentication.add_user_claims(RefreshToken.for_user(user).access_token, user)
+    token['is_active'] = False
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    # When: Posts are requested
+    resp = client.get(reverse('post-list'))
+    # Then: 401 is returned
+    assert resp.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_user_is_fetched_lazily_and_cached(user):
+    # Given: Token user
+    token = authentication.add_user_claims(RefreshToken.for_user(user).access_token, user)
+    token_user = authentication.TokenUser(token)
+    # When: Claimed attributes are used
+    with CaptureQueriesContext(connection) as claims_queries:
+        assert (token_user.pk, token_user.username, token_user.is_active) == (user.pk, 'john', True)
+    # Then: The user is not queried
+    assert len(claims_queries) == 0
+    # When: Attribute missing in claims is used by two requests
+    with CaptureQueriesContext(connection) as queries:
+        assert token_user.email == 'lennon@thebeatles.com'
+        assert authentication.TokenUser(token).email == 'lennon@thebeatles.com'
+    # Then: The user is queried once
+    assert len(queries) == 1
+
+
+def test_changed_user_is_not_served_from_cache(user):
+    # Given: Cached user
+    token = authentication.add_user_claims(RefreshToken.for_user(user).access_token, user)
+    assert authentication.TokenUser(token).email == 'lennon@thebeatles.com'
+    # When: The user is changed
+    user.email = 'john@thebeatles.com'
+    user.save()
+    # Then: Changed user is fetched
+    assert authentication.TokenUser(token).email == 'john@thebeatles.com'
+
+
+def test_user_instance_is_not_shared(user):
+    # Given: Token users of two requests of the same user
+    token = authentication.add_user_claims(RefreshToken.for_user(user).access_token, user)
+    first, second = authentication.TokenUser(token), authentication.TokenUser(token)
+    # When: The first request changes the user instance
+    first.user.first_name = 'John'
+    # Then: The second request sees the stored user
+    assert first.first_name == 'John'
+    assert second.first_name == ''
+
+
+def test_password_is_loaded_on_access(user):
+    # When: Cached user is used to check the password
+    token = authentication.add_user_claims(RefreshToken.for_user(user).access_token, user)
+    authentication.TokenUser(token).email
+    # Then: Password hash is not cached but loaded
+    assert authentication.get_user(user.pk).check_password('johnpassword')
+
+
+def test_demoted_staff_can_not_export(user):
+    # Given: Token issued to a staff user
+    user.is_staff = True
+    user.save()
+    access_token = obtain_tokens()['access']
+    # When: The user is demoted
+    user.is_staff = False
+    user.save()
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+    # Then: Export is forbidden even though the token claims staff
+    assert client.get(reverse('export')).status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,29 @@
+from unittest import mock
+
+from social_network.post.cache import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    # Given: Full cache
+    cache = LRUCache(max_size=2)
+    cache.set('first', 1)
+    cache.set('second', 2)
+    # Given: The first entry is used
+    assert cache.get('first') == 1
+    # When: A new entry is added
+    cache.set('third', 3)
+    # Then: The least recently used entry is evicted
+    assert cache.get('second') is None
+    assert (cache.get('first'), cache.get('third')) == (1, 3)
+
+
+@mock.patch('social_network.post.cache.time')
+def test_expired_entry_is_not_returned(time_mock):
+    # Given: Entry with 10 seconds timeout
+    cache = LRUCache()
+    time_mock.monotonic.return_value = 100
+    cache.set('key', 'value', timeout=10)
+    # When: The entry is requested after the timeout
+    time_mock.monotonic.return_value = 110
+    # Then: Default is returned
+    assert cache.get('key', 'default') == 'default'
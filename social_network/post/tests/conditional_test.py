@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from social_network.post.tests import utils as test_utils
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def post(author):
+    return test_utils.create_post_for_user(author)
+
+
+@pytest.fixture
+def client(author):
+    return test_utils.get_client(author)
+
+
+def posts_url(author):
+    return f'{reverse("post-list")}?creator={author.pk}'
+
+
+def test_unchanged_posts_are_not_queried(author, post, client):
+    # Given: Posts of the creator are requested
+    resp = client.get(posts_url(author))
+    assert resp.status_code == status.HTTP_200_OK
+    # When: Posts are requested with ETag of the response
+    with CaptureQueriesContext(connection) as queries:
+        not_modified = client.get(posts_url(author), HTTP_IF_NONE_MATCH=resp['ETag'])
+    # Then: 304 is returned without posts query
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified['ETag'] == resp['ETag']
+    assert not any('"post_post"' in query['sql'] for query in queries)
+
+
+def test_new_post_changes_etag(author, post, client):
+    # Given: ETag of posts of the creator
+    etag = client.get(posts_url(author))['ETag']
+    # When: The creator creates a post
+    test_utils.create_post_for_user(author)
+    # Then: Posts are returned once again
+    resp = client.get(posts_url(author), HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK
+    assert len(resp.json()['results']) == 2
+
+
+def test_like_changes_etag_of_post(author, post, client):
+    # Given: ETag of the post
+    url = reverse('post-detail', args=(post.pk,))
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+    # When: The post is liked
+    client.post(reverse('post-like', args=(post.pk,)))
+    # Then: The post is returned once again with new fan
+    resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == status.HTTP_200_OK
+    assert len(resp.json()['fans']) == 1
+
+
+def test_if_modified_since(author, post, client):
+    # Given: Last-Modified of the post
+    url = reverse('post-detail', args=(post.pk,))
+    last_modified = client.get(url)['Last-Modified']
+    # When: The post is requested with If-Modified-Since
+    resp = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    # Then: 304 is returned
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_fans_summary_etag_depends_on_user(author, fan, post, client):
+    # Given: ETag of fans summary of the author
+    url = f'{posts_url(author)}&fans=summary'
+    etag = client.get(url)['ETag']
+    # When: Another user requests the same url with the ETag
+    resp = test_utils.get_client(fan).get(url, HTTP_IF_NONE_MATCH=etag)
+    # Then: Posts are returned, liked_by_me of the user could differ
+    assert resp.status_code == status.HTTP_200_OK
+
+
+def test_list_without_creator_has_no_etag(post, client):
+    # When: All posts are requested
+    resp = client.get(reverse('post-list'))
+    # Then: Response is not conditional
+    assert resp.status_code == status.HTTP_200_OK
+    assert 'ETag' not in resp
@@ -0,0 +1,21 @@
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from social_network.post.cache import get_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_least_favorite_cache():
+    # Test cases are not committed, so results cached by a test are not invalidated for the next one
+    get_cache(settings.LEAST_FAVORITE_CACHE).clear()
+
+
+@pytest.fixture
+def author():
+    return User.objects.create_user('john', 'lennon@thebeatles.com', 'johnpassword')
+
+
+@pytest.fixture
+def fan():
+    return User.objects.create_user('paul', 'mccartney@thebeatles.com', 'paulpassword')
@@ -0,0 +1,194 @@
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from social_network.post import likes
+from social_network.post.constants import LikeResults
+from social_network.post.models import Post, Profile, UnlikedAuthor
+from social_network.post.tests import utils as test_utils
+
+
+@pytest.mark.django_db
+def test_profile_is_created_for_new_user(author):
+    # Given: Just created user
+    # Then: The user has a profile with empty counters
+    assert (author.profile.post_count, author.profile.liked_post_count) == (0, 0)
+
+
+@pytest.mark.django_db
+def test_counters_follow_likes(author, fan):
+    # Given: Two posts of the author
+    post = test_utils.create_post_for_user(author)
+    test_utils.create_post_for_user(author)
+    # When: One of the posts is liked twice
+    test_utils.like_post(post, fan)
+    test_utils.like_post(post, author)
+    post.refresh_from_db()
+    author.profile.refresh_from_db()
+    # Then: The post has two fans and the author has one liked post out of two
+    assert post.fan_count == 2
+    assert (author.profile.post_count, author.profile.liked_post_count) == (2, 1)
+    # When: Both fans are gone
+    post.fans.remove(fan, author)
+    post.refresh_from_db()
+    author.profile.refresh_from_db()
+    # Then: Counters are back to no likes
+    assert post.fan_count == 0
+    assert (author.profile.post_count, author.profile.liked_post_count) == (2, 0)
+
+
+@pytest.mark.django_db
+def test_posts_version_follows_posts_and_fans(author, fan):
+    # Given: Liked post of the author
+    post = test_utils.create_post_for_user(author)
+    likes.like_post(post.pk, author.pk, fan.pk)
+    author.profile.refresh_from_db()
+    version = author.profile.posts_version
+    # When: The post gets one more fan
+    likes.like_post(post.pk, author.pk, author.pk)
+    author.profile.refresh_from_db()
+    # Then: Posts version is changed although counters of the author are not
+    assert author.profile.posts_version > version
+    assert author.profile.posts_modified_at is not None
+    assert author.profile.liked_post_count == 1
+
+
+@pytest.mark.django_db
+def test_concurrent_like_is_counted_once(author, fan):
+    # Given: Post liked by a concurrent request between the read and the insert of a batch like
+    post = test_utils.create_post_for_user(author)
+    insert_likes = likes.insert_likes
+
+    def insert_after_concurrent_like(post_ids, user_id):
+        likes.like_post(post.pk, author.pk, user_id)
+        return insert_likes(post_ids, user_id)
+
+    # When: The post is liked by the batch
+    with mock.patch('social_network.post.likes.insert_likes', insert_after_concurrent_like):
+        results = likes.like_posts([post.pk], fan.pk)
+    post.refresh_from_db()
+    author.profile.refresh_from_db()
+    # Then: The like is counted once and reported as already liked
+    assert results == {post.pk: LikeResults.ALREADY_LIKED.value}
+    assert post.fan_count == 1
+    assert author.profile.liked_post_count == 1
+
+
+@pytest.mark.django_db
+def test_batch_like_without_returning(author, fan):
+    # Given: Post liked by the fan and post not liked yet, database does not return inserted rows
+    liked_post = test_utils.create_post_for_user(author)
+    test_utils.like_post(liked_post, fan)
+    post = test_utils.create_post_for_user(author)
+    # When: Both posts are liked by the batch
+    with mock.patch('social_network.post.likes.can_return_inserted', return_value=False):
+        inserted = likes.insert_likes([liked_post.pk, post.pk], fan.pk)
+    # Then: Only the new like is reported as inserted
+    assert inserted == {post.pk}
+    assert post.fans.filter(pk=fan.pk).exists()
+
+
+@pytest.mark.django_db
+def test_deleted_fan_is_not_counted(author, fan):
+    # Given: Post liked by the only fan
+    post = test_utils.create_post_for_user(author)
+    test_utils.like_post(post, fan)
+    # When: The fan is deleted
+    fan.delete()
+    post.refresh_from_db()
+    author.profile.refresh_from_db()
+    # Then: The post has no fans and the author is unliked again
+    assert post.fan_count == 0
+    assert author.profile.liked_post_count == 0
+    assert UnlikedAuthor.objects.filter(user=author).exists()
+
+
+@pytest.mark.django_db
+def test_removing_not_a_fan_does_not_change_counters(author, fan):
+    # Given: Liked post
+    post = test_utils.create_post_for_user(author)
+    test_utils.like_post(post, author)
+    # When: User that is not a fan is removed from fans
+    post.fans.remove(fan)
+    post.refresh_from_db()
+    # Then: Fan count is not changed
+    assert post.fan_count == 1
+
+
+@pytest.mark.django_db
+def test_deleted_liked_post_is_not_counted(author, fan):
+    # Given: Liked post
+    post = test_utils.create_post_for_user(author)
+    test_utils.like_post(post, fan)
+    # When: The post is deleted
+    post.delete()
+    author.profile.refresh_from_db()
+    # Then: The author has neither posts nor liked posts
+    assert (author.profile.post_count, author.profile.liked_post_count) == (0, 0)
+
+
+@pytest.mark.django_db
+def test_counters_follow_changed_creator(author, fan):
+    # Given: Liked post of the author
+    post = test_utils.create_post_for_user(author)
+    test_utils.like_post(post, fan)
+    author.profile.refresh_from_db()
+    version = author.profile.posts_version
+    # When: The post is moved to another creator
+    client = test_utils.get_client(author)
+    resp = client.patch(reverse('post-detail', args=(post.pk,)),
+                        {'creator': f'http://testserver{reverse("user-detail", args=(fan.pk,))}'}, format='json')
+    assert resp.status_code == status.HTTP_200_OK
+    author.profile.refresh_from_db()
+    fan.profile.refresh_from_db()
+    # Then: Counters of the post are moved to the new creator
+    assert (author.profile.post_count, author.profile.liked_post_count) == (0, 0)
+    assert (fan.profile.post_count, fan.profile.liked_post_count) == (1, 1)
+    assert not UnlikedAuthor.objects.exists()
+    # Then: Posts of the previous creator are marked as modified
+    assert author.profile.posts_version > version
+
+
+@pytest.mark.django_db
+def test_unliked_authors_follow_likes(author, fan):
+    # Given: Author of a not liked post
+    post = test_utils.create_post_for_user(author)
+    assert list(UnlikedAuthor.objects.values_list('user', flat=True)) == [author.pk]
+    # When: The post is liked
+    test_utils.like_post(post, fan)
+    # Then: The author is not unliked author anymore
+    assert not UnlikedAuthor.objects.exists()
+    # When: The post is unliked
+    post.fans.remove(fan)
+    # Then: The author is unliked author again
+    assert UnlikedAuthor.objects.filter(user=author).exists()
+    # When: The post is deleted
+    post.delete()
+    # Then: The author has no posts and is not unliked author
+    assert not UnlikedAuthor.objects.exists()
+
+
+@pytest.mark.django_db
+def test_backfill_counters(author, fan):
+    # Given: Posts and likes with broken counters and no profile
+    post = test_utils.create_post_for_user(author)
+    test_utils.create_post_for_user(author)
+    test_utils.like_post(post, fan)
+    Post.objects.update(fan_count=0)
+    Profile.objects.all().delete()
+    # When: Counters are backfilled
+    with mock.patch('social_network.post.least_favorite.invalidate') as invalidate:
+        call_command('backfill_counters', batch_size=1)
+    post.refresh_from_db()
+    profile = Profile.objects.get(user=author)
+    # Then: Counters match posts and likes
+    assert post.fan_count == 1
+    assert (profile.post_count, profile.liked_post_count) == (2, 1)
+    assert Profile.objects.filter(user=fan, post_count=0).exists()
+    assert not UnlikedAuthor.objects.exists()
+    # Then: Cached responses are invalidated
+    assert profile.posts_version == 1
+    invalidate.assert_called_once_with()
@@ -0,0 +1,103 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from social_network.post import export
+from social_network.post.tests import utils as test_utils
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def graph(author, fan):
+    post = test_utils.create_post_for_user(author)
+    test_utils.like_post(post, fan)
+    return author, fan, post
+
+
+def parse(content):
+    return [json.loads(line) for line in content.decode().splitlines()]
+
+
+def test_records_of_all_tables_are_exported(graph):
+    author, fan, post = graph
+    # When: Records are exported with small chunks
+    records = list(export.iter_records(chunk_size=1))
+    # Then: Users, posts and likes are exported in this order
+    assert [(record['type'], record.get('id')) for record in records] == \
+        [('user', author.pk), ('user', fan.pk), ('post', post.pk), ('like', None)]
+    assert records[2]['creator_id'] == author.pk
+    assert (records[3]['post_id'], records[3]['user_id']) == (post.pk, fan.pk)
+    assert 'password' not in records[0]
+
+
+def test_gzip_stream_is_valid_gzip():
+    # Given: Lines bigger than one compressed block
+    lines = [f'{{"line": {i}}}\n'.encode() for i in range(20000)]
+    # When: Lines are compressed
+    compressed = b''.join(export.gzip_stream(iter(lines)))
+    # Then: Decompressed data is the same
+    assert gzip.decompress(compressed) == b''.join(lines)
+
+
+def test_export_command(graph, tmp_path):
+    # When: Export command writes compressed file
+    output = tmp_path / 'export.ndjson.gz'
+    call_command('export_ndjson', str(output), '--gzip', '--chunk-size', '1')
+    # Then: The file has all records
+    assert [record['type'] for record in parse(gzip.decompress(output.read_bytes()))] == \
+        ['user', 'user', 'post', 'like']
+
+
+def test_likes_added_during_export_are_not_exported(graph):
+    author, fan, post = graph
+    # Given: Started export
+    records = export.iter_records(chunk_size=1)
+    next(records)
+    # When: A like is added during the export
+    test_utils.like_post(post, author)
+    # Then: The like is not exported
+    assert [record['user_id'] for record in records if record['type'] == 'like'] == [fan.pk]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_endpoint_is_not_served_by_asgi(graph):
+    author, fan, post = graph
+    author.is_staff = True
+    author.save()
+    token = RefreshToken.for_user(author).access_token
+    # When: Staff user requests export from the ASGI application
+    resp = asyncio.run(AsyncClient().get(reverse('export'), authorization=f'Bearer {token}'))
+    # Then: 404 is returned, the export is not streamed by the event loop
+    assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_endpoint_is_streamed_to_staff(graph):
+    author, fan, post = graph
+    author.is_staff = True
+    author.save()
+    # When: Staff user requests compressed and plain export
+    plain = test_utils.get_client(author).get(reverse('export'))
+    compressed = test_utils.get_client(author).get(reverse('export'), {'gzip': 1})
+    # Then: Both are streamed with all records
+    assert plain.streaming and compressed.streaming
+    assert plain['Content-Type'] == 'application/x-ndjson'
+    records = parse(b''.join(plain.streaming_content))
+    assert len(records) == 4
+    assert parse(gzip.decompress(b''.join(compressed.streaming_content))) == records
+
+
+def test_export_endpoint_is_forbidden_for_users(graph):
+    author, fan, post = graph
+    # When: Not staff user requests export
+    resp = test_utils.get_client(fan).get(reverse('export'))
+    # Then: 403 is returned
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,111 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from social_network.post import tasks
+from social_network.post.models import FeedEntry
+from social_network.post.tests import utils as test_utils
+
+pytestmark = pytest.mark.django_db
+
+
+def run_tasks():
+    # Tasks are run by the test thread, workers of process_tasks would not see data of the test transaction
+    for task in tasks.claim_tasks(limit=100):
+        tasks.run_task(task)
+
+
+def like_author(author, fan):
+    post = test_utils.create_post_for_user(author)
+    run_tasks()
+    test_utils.like_post(post, fan)
+
+
+@pytest.fixture
+def fan(author, fan):
+    like_author(author, fan)
+    return fan
+
+
+def get_feed(user, **params):
+    run_tasks()
+    resp = test_utils.get_client(user).get(reverse('feed-list'), params)
+    assert resp.status_code == status.HTTP_200_OK
+    return resp.json()
+
+
+def test_new_post_is_added_to_feeds_of_fans(author, fan):
+    # Given: User that has not liked posts of the author
+    stranger = User.objects.create_user('george', 'harrison@thebeatles.com', 'georgepassword')
+    # When: The author creates a post
+    post = test_utils.create_post_for_user(author)
+    # Then: Feeds are not changed until the task is executed
+    assert not FeedEntry.objects.exists()
+    # Then: The post is in the feed of the fan only
+    assert [item['id'] for item in get_feed(fan)['results']] == [post.pk]
+    assert get_feed(stranger)['results'] == []
+    assert get_feed(author)['results'] == []
+
+
+def test_bulk_created_posts_are_added_to_feeds(author, fan):
+    # When: The author creates posts in bulk
+    creator_url = f'http://testserver{reverse("user-detail", args=(author.pk,))}'
+    resp = test_utils.get_client(author).post(reverse('post-list'), [test_utils.build_post_payload(creator_url)] * 3,
+                                              format='json')
+    assert resp.status_code == status.HTTP_201_CREATED
+    run_tasks()
+    # Then: All posts are in the feed of the fan
+    assert FeedEntry.objects.filter(user=fan).count() == 3
+
+
+def test_fan_out_inserts_entries_in_batches(author, fan, settings):
+    # Given: Batches smaller than the number of feed entries
+    settings.FEED_FAN_OUT_BATCH = 2
+    george = User.objects.create_user('george', 'harrison@thebeatles.com', 'georgepassword')
+    like_author(author, george)
+    # When: The author creates posts in bulk
+    creator_url = f'http://testserver{reverse("user-detail", args=(author.pk,))}'
+    resp = test_utils.get_client(author).post(reverse('post-list'), [test_utils.build_post_payload(creator_url)] * 3,
+                                              format='json')
+    assert resp.status_code == status.HTTP_201_CREATED
+    with CaptureQueriesContext(connection) as context:
+        run_tasks()
+    # Then: 3 entries for each of 2 fans are inserted by 3 statements
+    assert FeedEntry.objects.filter(user=george).count() == 3
+    inserts = [query for query in context.captured_queries
+               if query['sql'].startswith('INSERT OR IGNORE INTO "post_feedentry"')]
+    assert len(inserts) == 3
+
+
+def test_feed_is_paginated_newest_first(author, fan):
+    # Given: Posts in the feed of the fan, one of them is liked by the fan
+    posts = [test_utils.create_post_for_user(author) for _ in range(3)]
+    test_utils.like_post(posts[0], fan)
+    # When: The feed is read by pages of 2 posts
+    first_page = get_feed(fan, page_size=2)
+    second_page = test_utils.get_client(fan).get(first_page['next']).json()
+    # Then: Posts are returned newest first with fans summary
+    results = first_page['results'] + second_page['results']
+    assert [item['id'] for item in results] == [post.pk for post in reversed(posts)]
+    assert [item['liked_by_me'] for item in results] == [False, False, True]
+    assert results[-1]['fan_count'] == 1
+
+
+def test_feed_page_is_read_with_constant_number_of_queries(author, fan):
+    # Given: Feed with one post
+    test_utils.create_post_for_user(author)
+    client = test_utils.get_client(fan)
+    run_tasks()
+    with CaptureQueriesContext(connection) as single:
+        client.get(reverse('feed-list'))
+    # When: More posts are added to the feed
+    for _ in range(5):
+        test_utils.create_post_for_user(author)
+    run_tasks()
+    with CaptureQueriesContext(connection) as many:
+        client.get(reverse('feed-list'))
+    # Then: Number of queries does not depend on the number of posts
+    assert len(many) == len(single)
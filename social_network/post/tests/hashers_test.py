@@ -0,0 +1,40 @@
+import pytest
+from django.contrib.auth import hashers
+
+HASHERS = ['social_network.post.hashers.PBKDF2PasswordHasher']
+
+
+@pytest.fixture
+def pbkdf2_settings(settings):
+    settings.PASSWORD_HASHERS = HASHERS + ['django.contrib.auth.hashers.PBKDF2PasswordHasher']
+    settings.PASSWORD_HASH_ITERATIONS = 1000
+    return settings
+
+
+def test_work_factor_is_configured(pbkdf2_settings):
+    # When: Password is hashed
+    encoded = hashers.make_password('johnpassword')
+    # Then: Configured number of iterations is used
+    assert encoded.startswith('pbkdf2_sha256$1000$')
+    assert hashers.check_password('johnpassword', encoded)
+
+
+def test_hashes_are_compatible_with_django_hasher(pbkdf2_settings):
+    # Given: Password hashed by Django hasher
+    encoded = hashers.PBKDF2PasswordHasher().encode('johnpassword', hashers.PBKDF2PasswordHasher().salt(), 500)
+    # Then: It is verified and has to be rehashed with the configured work factor
+    assert hashers.check_password('johnpassword', encoded)
+    assert hashers.get_hasher('default').must_update(encoded)
+
+
+def test_hashes_are_computed_by_pool(pbkdf2_settings):
+    # Given: Pool of hashing processes
+    pbkdf2_settings.PASSWORD_HASHING_WORKERS = 1
+    try:
+        # When: Password is hashed and checked
+        encoded = hashers.make_password('johnpassword')
+        # Then: The same hash as without pool is returned
+        assert hashers.check_password('johnpassword', encoded)
+        assert not hashers.check_password('paulpassword', encoded)
+    finally:
+        pbkdf2_settings.PASSWORD_HASHING_WORKERS = 0
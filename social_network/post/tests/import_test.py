@@ -0,0 +1,97 @@
+import logging
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+
+from social_network.post.models import Like, Post, Profile
+from social_network.post.tests import utils as test_utils
+
+pytestmark = pytest.mark.django_db
+
+
+def test_exported_data_is_imported(tmp_path):
+    # Given: Exported users, posts and likes
+    author = User.objects.create_user('john', 'lennon@thebeatles.com', 'johnpassword')
+    fan = User.objects.create_user('paul', 'mccartney@thebeatles.com', 'paulpassword')
+    post = test_utils.create_post_for_user(author)
+    test_utils.like_post(post, fan)
+    output = tmp_path / 'export.ndjson.gz'
+    call_command('export_ndjson', str(output), '--gzip')
+    # Given: Empty database
+    Like.objects.all().delete()
+    Post.objects.all().delete()
+    User.objects.all().delete()
+    # When: Export is imported
+    call_command('import_ndjson', str(output), '--password', 'secret', '--batch-size', '1')
+    # Then: Records are restored with their ids and timestamps
+    imported_post = Post.objects.get(pk=post.pk)
+    assert (imported_post.creator_id, imported_post.data, imported_post.created_at) == \
+        (author.pk, str(post.data), post.created_at)
+    assert list(Like.objects.values_list('post_id', 'user_id')) == [(post.pk, fan.pk)]
+    # Then: Users log in with the given password and counters are recalculated
+    assert User.objects.get(pk=author.pk).check_password('secret')
+    assert imported_post.fan_count == 1
+    assert (Profile.objects.get(pk=author.pk).post_count, Profile.objects.get(pk=author.pk).liked_post_count) == \
+        (1, 1)
+    # Then: Posts of the author are marked as modified
+    assert Profile.objects.get(pk=author.pk).posts_version == 1
+
+
+def test_generated_data_is_loaded():
+    # Given: Existing post
+    test_utils.create_post_for_user(User.objects.create_user('john'))
+    # When: Users with posts and likes are generated
+    call_command('import_ndjson', '--generate', 5, '--posts-per-user', 2, '--likes-per-user', 3, '--seed', 1)
+    # Then: Every user has posts and likes
+    assert (User.objects.count(), Post.objects.count(), Like.objects.count()) == (6, 11, 15)
+    assert sum(Post.objects.values_list('fan_count', flat=True)) == 15
+    assert set(Profile.objects.exclude(user__username='john').values_list('post_count', flat=True)) == {2}
+    # Then: Users joined and posts were created at different times
+    assert User.objects.values('date_joined').distinct().count() == 6
+    assert Post.objects.values('created_at').distinct().count() == 11
+    # Then: New posts get ids after generated ones
+    assert test_utils.create_post_for_user(User.objects.get(username='john')).pk == 12
+
+
+def test_input_or_generate_is_required():
+    with pytest.raises(CommandError):
+        call_command('import_ndjson')
+
+
+def test_record_with_unknown_field_is_rejected(tmp_path):
+    # Given: Post record with a field Post does not have
+    path = tmp_path / 'import.ndjson'
+    path.write_text('{"type": "user", "id": 1, "username": "john"}\n'
+                    '{"type": "post", "id": 1, "creator_id": 1, "data": "post", "author": "john"}\n')
+    # When: The file is imported
+    with pytest.raises(CommandError, match='Record 2 has unknown fields author'):
+        call_command('import_ndjson', str(path))
+    # Then: Records before the invalid one are loaded
+    assert list(User.objects.values_list('username', flat=True)) == ['john']
+
+
+def test_record_with_invalid_value_is_rejected(tmp_path):
+    # Given: User record with invalid date
+    path = tmp_path / 'import.ndjson'
+    path.write_text('{"type": "user", "id": 1, "username": "john", "date_joined": "yesterday"}\n')
+    # When: The file is imported
+    with pytest.raises(CommandError, match='Record 1 is invalid'):
+        call_command('import_ndjson', str(path))
+
+
+def test_interrupted_import_is_resumed_with_skip_existing(tmp_path, caplog):
+    # Given: Import which is already partially loaded
+    path = tmp_path / 'import.ndjson'
+    path.write_text('{"type": "user", "id": 1, "username": "john"}\n'
+                    '{"type": "user", "id": 2, "username": "paul"}\n')
+    User.objects.create_user('john', id=1)
+    # When: The file is imported
+    with pytest.raises(CommandError, match='user records 1-2 are not loaded'):
+        call_command('import_ndjson', str(path))
+    # When: The file is imported skipping existing rows
+    with caplog.at_level(logging.INFO):
+        call_command('import_ndjson', str(path), '--skip-existing')
+    # Then: Missing records are loaded and only they are counted
+    assert list(User.objects.order_by('pk').values_list('username', flat=True)) == ['john', 'paul']
+    assert 'Loaded 1 users, 0 posts, 0 likes' in caplog.messages
@@ -0,0 +1,67 @@
+import pytest
+from django.db import IntegrityError, connection
+
+from social_network.post.models import FeedEntry, Like, Post, UnlikedAuthor
+from social_network.post.tests import utils as test_utils
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(connection.vendor != 'sqlite', reason='Query plans are checked for SQLite'),
+]
+
+
+@pytest.fixture
+def author(author):
+    test_utils.like_post(test_utils.create_post_for_user(author), author)
+    return author
+
+
+def test_posts_of_creator_use_creator_index(author):
+    # When: Posts of the creator are queried in pagination order
+    plan = Post.objects.filter(creator=author).order_by('-created_at', '-id').explain()
+    # Then: Composite creator index is used
+    assert 'post_creator_created_at_idx' in plan
+
+
+def test_posts_page_uses_created_at_index(author):
+    # When: Page of posts is queried
+    plan = Post.objects.order_by('-created_at', '-id')[:10].explain()
+    # Then: Posts are read in index order
+    assert 'post_created_at_id_idx' in plan
+
+
+def test_like_lookup_uses_unique_index(author):
+    # When: Like of the user is looked up
+    plan = Like.objects.filter(post_id=1, user=author).explain()
+    # Then: Unique (post, user) index is used
+    assert 'uniq' in plan
+
+
+def test_likes_of_user_use_liked_at_index(author):
+    # When: Latest likes of the user are queried
+    plan = Like.objects.filter(user=author).order_by('-liked_at').explain()
+    # Then: Composite user index is used
+    assert 'like_user_liked_at_idx' in plan
+
+
+def test_unliked_authors_page_uses_since_index(author):
+    # When: Page of unliked authors is queried
+    plan = UnlikedAuthor.objects.order_by('-since', '-user_id')[:10].explain()
+    # Then: Authors are read in index order
+    assert 'unliked_author_since_idx' in plan
+
+
+def test_like_is_unique(author):
+    # Given: Liked post
+    like = Like.objects.get(user=author)
+    # When: The same like is inserted again
+    # Then: Database rejects it
+    with pytest.raises(IntegrityError):
+        Like.objects.create(post=like.post, user=author)
+
+
+def test_feed_page_uses_feed_index(author):
+    # When: Page of the user feed is queried
+    plan = FeedEntry.objects.filter(user=author).order_by('-created_at', '-post_id')[:10].explain()
+    # Then: Entries are read in index order
+    assert 'feed_entry_user_created_idx' in plan
@@ -0,0 +1,52 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from social_network.post.tests import utils as test_utils
+
+
+@pytest.fixture
+def fan_client(fan):
+    return test_utils.get_client(fan)
+
+
+def get_least_favorite(client):
+    with CaptureQueriesContext(connection) as queries:
+        resp = client.get(reverse('user-least-favorite'))
+    return [user['username'] for user in resp.json()['results']], len(queries)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_least_favorite_is_served_from_cache(author, fan_client):
+    # Given: Author of not liked post
+    test_utils.create_post_for_user(author)
+    # Given: least_favorite is requested
+    usernames, queries = get_least_favorite(fan_client)
+    assert usernames == ['john']
+    # When: least_favorite is requested once again
+    cached_usernames, cached_queries = get_least_favorite(fan_client)
+    # Then: The same result is returned without users query
+    assert cached_usernames == usernames
+    assert cached_queries == queries - 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_least_favorite_cache_is_invalidated_by_like(author, fan_client):
+    # Given: Cached least_favorite result with the author of not liked post
+    post = test_utils.create_post_for_user(author)
+    assert get_least_favorite(fan_client)[0] == ['john']
+    # When: The post is liked
+    fan_client.post(reverse('post-like', args=(post.pk,)))
+    # Then: The author is not returned anymore
+    assert get_least_favorite(fan_client)[0] == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_least_favorite_cache_is_invalidated_by_new_post(author, fan_client):
+    # Given: Cached empty least_favorite result
+    assert get_least_favorite(fan_client)[0] == []
+    # When: A post is created
+    test_utils.create_post_for_user(author)
+    # Then: Author of the new post is returned
+    assert get_least_favorite(fan_client)[0] == ['john']
@@ -0,0 +1,23 @@
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from social_network.post.serializers import UserSerializer
+
+
+@pytest.mark.django_db
+@mock.patch('social_network.post.utils.populate_clearbit_user_data_async', mock.Mock())
+def test_user_is_written_once():
+    # Given: Valid signup data
+    serializer = UserSerializer(data={'username': 'john', 'password': 'johnpassword'})
+    assert serializer.is_valid()
+    # When: The user is created
+    with CaptureQueriesContext(connection) as queries:
+        user = serializer.save()
+    # Then: The user is inserted with hashed password and not updated afterwards
+    user_writes = [query['sql'] for query in queries if '"auth_user"' in query['sql'] and
+                   query['sql'].startswith(('INSERT', 'UPDATE'))]
+    assert len(user_writes) == 1 and user_writes[0].startswith('INSERT')
+    assert user.check_password('johnpassword')
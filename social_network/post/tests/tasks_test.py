@@ -0,0 +1,121 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from social_network.post import tasks, utils
+from social_network.post.models import Task
+
+executed = []
+
+
+def succeeding_handler(value):
+    executed.append(value)
+
+
+def failing_handler():
+    raise ConnectionError('Service is not available')
+
+
+@pytest.fixture(autouse=True)
+def clear_executed():
+    executed.clear()
+
+
+@pytest.mark.django_db
+def test_successful_task_is_removed():
+    # Given: Task in the queue
+    tasks.enqueue(succeeding_handler, value=1)
+    # When: The task is claimed and executed
+    [task] = tasks.claim_tasks(limit=10)
+    tasks.run_task(task)
+    # Then: Handler is called and the task is removed from the queue
+    assert executed == [1]
+    assert not Task.objects.exists()
+
+
+@pytest.mark.django_db
+def test_failed_task_is_retried_with_backoff(settings):
+    settings.TASK_QUEUE_RETRY_BACKOFF = 10
+    # Given: Task that fails
+    tasks.enqueue(failing_handler)
+    # When: The task is executed and executed once again when it is due
+    [task] = tasks.claim_tasks(limit=10)
+    tasks.run_task(task)
+    Task.objects.update(run_after=timezone.now())
+    [task] = tasks.claim_tasks(limit=10)
+    tasks.run_task(task)
+    # Then: The task is pending with doubled delay
+    task.refresh_from_db()
+    assert task.status == Task.PENDING
+    assert task.attempts == 2
+    assert 'Service is not available' in task.last_error
+    assert task.run_after > timezone.now() + timedelta(seconds=15)
+
+
+@pytest.mark.django_db
+def test_task_is_failed_after_max_attempts(settings):
+    settings.TASK_QUEUE_MAX_ATTEMPTS = 1
+    # Given: Task that fails
+    tasks.enqueue(failing_handler)
+    # When: The task is executed
+    [task] = tasks.claim_tasks(limit=10)
+    tasks.run_task(task)
+    # Then: The task is failed and is not claimed anymore
+    task.refresh_from_db()
+    assert task.status == Task.FAILED
+    assert tasks.claim_tasks(limit=10) == []
+
+
+@pytest.mark.django_db
+def test_claimed_task_is_not_claimed_again():
+    # Given: Task claimed by a worker
+    tasks.enqueue(succeeding_handler, value=1)
+    tasks.claim_tasks(limit=10)
+    # When: Another worker claims tasks
+    # Then: Nothing is claimed
+    assert tasks.claim_tasks(limit=10) == []
+
+
+@pytest.mark.django_db
+def test_task_of_lost_worker_is_claimed_again(settings):
+    settings.TASK_QUEUE_LOCK_TIMEOUT = 60
+    # Given: Task claimed by a worker that has not finished it in time
+    tasks.enqueue(succeeding_handler, value=1)
+    tasks.claim_tasks(limit=10)
+    Task.objects.update(locked_at=timezone.now() - timedelta(seconds=61))
+    # When: Another worker claims tasks
+    # Then: The task is claimed
+    assert len(tasks.claim_tasks(limit=10)) == 1
+
+
+@pytest.mark.django_db
+def test_task_of_lost_worker_is_failed_after_max_attempts(settings):
+    settings.TASK_QUEUE_LOCK_TIMEOUT = 60
+    settings.TASK_QUEUE_MAX_ATTEMPTS = 1
+    # Given: Task which used its only attempt by a worker that has not finished it in time
+    tasks.enqueue(succeeding_handler, value=1)
+    tasks.claim_tasks(limit=10)
+    Task.objects.update(locked_at=timezone.now() - timedelta(seconds=61))
+    # When: Another worker claims tasks
+    # Then: The task is not claimed and is failed
+    assert tasks.claim_tasks(limit=10) == []
+    assert Task.objects.get().status == Task.FAILED
+
+
+@pytest.mark.django_db(transaction=True)
+@mock.patch('clearbit.Enrichment.find', lambda *args, **kwargs: {'person': {'name': {'givenName': 'John',
+                                                                                     'familyName': 'Lennon'}}})
+def test_process_tasks_drains_the_queue():
+    # Given: Users waiting for clearbit data
+    users = [User.objects.create_user(f'john{i}', 'lennon@thebeatles.com', 'johnpassword') for i in range(3)]
+    for user in users:
+        utils.populate_clearbit_user_data_async(user.pk, user.email)
+    # When: Tasks are processed
+    processed = tasks.process_tasks(concurrency=2)
+    # Then: All tasks are executed
+    assert processed == 3
+    assert not Task.objects.exists()
+    assert User.objects.filter(first_name='John', last_name='Lennon').count() == 3
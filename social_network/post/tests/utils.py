@@ -1,4 +1,8 @@
 from uuid import uuid1
+
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
 from social_network.post.models import Post
 
 
@@ -32,3 +36,9 @@ def like_post(post, user):
 
 def build_post_payload(user_url):
     return {'data': 'some date', 'creator': user_url}
+
+
+def get_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
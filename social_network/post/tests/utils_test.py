@@ -1,28 +1,39 @@
+import logging
 from unittest import mock
 from social_network.post import utils
 from social_network.post.tests import utils as test_utils
+from social_network.post.cache import get_cache
 from social_network.post.constants import HunterCodes
+from social_network.post.models import Task
 import pytest
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.management import call_command
 from rest_framework.serializers import ValidationError
 
 
+@pytest.fixture(autouse=True)
+def clear_email_verification_cache():
+    get_cache(settings.EMAIL_VERIFICATION_CACHE).clear()
+    utils.email_verification_metrics.reset()
+
+
 @pytest.fixture(autouse=False)
 def created_user():
     user = User.objects.create_user('john', 'lennon@thebeatles.com', 'johnpassword')
     return user
 
 
-@mock.patch('social_network.post.utils.threading')
-def test_populate_clearbit_user_data_async_called(threading_mock):
+@pytest.mark.django_db
+def test_populate_clearbit_user_data_async_called():
     # Given: user_id and email to process
     user_data = ('user_id', 'email')
     # When: populate_clearbit_user_data_async is called with user data
     utils.populate_clearbit_user_data_async(*user_data)
-    # Then: A new thread with expected target function is created
-    threading_mock.Thread.assert_called_once_with(target=utils.populate_clearbit_user_data, args=user_data)
-    # Then: The thread is started
-    assert threading_mock.Thread.return_value.start.call_count == 1
+    # Then: A background task with expected target function is stored
+    task = Task.objects.get()
+    assert task.handler == 'social_network.post.utils.populate_clearbit_user_data'
+    assert task.kwargs == {'user_id': 'user_id', 'email': 'email'}
 
 
 def test_fetch_name_data_with_no_email():
@@ -91,3 +102,75 @@ def test_verify_email_for_invalid_address(hunter_mock):
         # Then: Validation error is thrown due to bad status
         utils.verify_email(the_user)
 
+
+@mock.patch('social_network.post.utils.hunter')
+def test_verify_email_result_is_cached(hunter_mock):
+    # Given: hunter returns valid email status
+    hunter_mock.email_verifier = mock.Mock(return_value={'result': HunterCodes.DELIVERABLE.value})
+    # When: verify email is called twice for the same address
+    utils.verify_email('no@matter.com')
+    utils.verify_email('No@Matter.com ')
+    # Then: hunter is requested once and the second call is a cache hit
+    assert hunter_mock.email_verifier.call_count == 1
+    assert utils.email_verification_metrics.snapshot() == {'misses': 1, 'hits': 1}
+
+
+@mock.patch('social_network.post.utils.hunter')
+def test_email_verification_metrics_are_logged(hunter_mock, settings, caplog):
+    # Given: Metrics are logged every 2 lookups
+    settings.CACHE_METRICS_LOG_INTERVAL = 2
+    hunter_mock.email_verifier = mock.Mock(return_value={'result': HunterCodes.DELIVERABLE.value})
+    # When: The same address is verified twice
+    with caplog.at_level(logging.INFO, logger='social_network.metrics'):
+        utils.verify_email('no@matter.com')
+        utils.verify_email('no@matter.com')
+    # Then: Hits and misses are logged once
+    assert caplog.messages == ['email_verification cache: hits 1, misses 1, hit ratio 50.0%']
+
+
+@mock.patch('social_network.post.utils.hunter')
+def test_verify_email_for_domain_with_no_mail_servers(hunter_mock):
+    # Given: hunter reports that the domain has no mail servers
+    hunter_mock.email_verifier = mock.Mock(return_value={'result': HunterCodes.UNDELIVERABLE.value,
+                                                         'mx_records': False})
+    with pytest.raises(ValidationError):
+        utils.verify_email('first@nowhere.com')
+    # When: another address of the domain is verified
+    with pytest.raises(ValidationError):
+        # Then: Validation error is thrown without hunter request
+        utils.verify_email('second@nowhere.com')
+    assert hunter_mock.email_verifier.call_count == 1
+    assert utils.email_verification_metrics.snapshot()['domain_hits'] == 1
+
+
+@mock.patch('social_network.post.utils.hunter')
+def test_verify_email_error_is_not_cached(hunter_mock):
+    # Given: hunter is not available
+    hunter_mock.email_verifier = mock.Mock(side_effect=ConnectionError)
+    # When: verify email is called twice
+    utils.verify_email('no@matter.com')
+    utils.verify_email('no@matter.com')
+    # Then: hunter is requested each time
+    assert hunter_mock.email_verifier.call_count == 2
+
+
+@pytest.mark.django_db
+@mock.patch('clearbit.Enrichment.find', test_utils.get_person_response)
+def test_enrich_users_command(tmp_path):
+    clearbit_name = test_utils.get_person_response()['person']['name']
+    # Given: Users with no names and a user with name
+    users = [User.objects.create_user(f'john{i}', 'lennon@thebeatles.com', 'johnpassword') for i in range(3)]
+    named_user = User.objects.create_user('paul', 'mccartney@thebeatles.com', 'paulpassword', first_name='Paul',
+                                          last_name='McCartney')
+    # Given: The first user was processed by the previous run
+    state_file = tmp_path / 'state'
+    state_file.write_text(str(users[0].pk))
+    # When: enrich_users command is run
+    call_command('enrich_users', batch_size=1, rate=1000, state_file=str(state_file))
+    # Then: Names of not processed users are populated
+    assert User.objects.filter(first_name=clearbit_name['givenName'],
+                               last_name=clearbit_name['familyName']).count() == 2
+    assert User.objects.get(pk=users[0].pk).first_name == ''
+    assert User.objects.get(pk=named_user.pk).first_name == 'Paul'
+    # Then: The last processed user is stored
+    assert state_file.read_text() == str(users[-1].pk)
@@ -5,7 +5,9 @@ from django.contrib.auth.models import User
 
 from social_network.post.tests import utils as test_utils
 from social_network.post.models import Post
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from unittest import mock
 from rest_framework.serializers import ValidationError
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -80,6 +82,27 @@ class UserTest(ApiTest):
         self.assertEqual(user_data['last_name'], self.api_user.last_name)
         self.assertEqual(user_data['id'], self.api_user.pk)
 
+    def test_list_users(self):
+        # When: Users list is requested
+        resp = self.api_client.get(reverse('user-list'))
+        # Then: 200 is returned with a page of users
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([user['username'] for user in resp.json()['results']], [self.username])
+
+    def test_list_users_queries_do_not_depend_on_number_of_users(self):
+        # Given: Number of queries for the list with one user
+        with CaptureQueriesContext(connection) as one_user_queries:
+            self.api_client.get(reverse('user-list'))
+        # Given: More users are created
+        for i in range(5):
+            User.objects.create_user(username=f'user{i}', password='asdf')
+        # When: Users list is requested
+        with CaptureQueriesContext(connection) as many_users_queries:
+            resp = self.api_client.get(reverse('user-list'))
+        # Then: All users are returned with the same number of queries
+        self.assertEqual(len(resp.json()['results']), 6)
+        self.assertEqual(len(one_user_queries), len(many_users_queries))
+
     def test_retrieve_non_existing_user(self):
         # Given: Non existing user id
         usr_id = 300
@@ -98,7 +121,7 @@ class UserTest(ApiTest):
         resp = self.api_client.get(reverse('user-least-favorite'))
         # Then: 200 empty response is returned
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        self.assertEqual(resp.json(), [])
+        self.assertEqual(resp.json()['results'], [])
 
     def test_get_user_with_no_likes(self):
         # Given: User with created post
@@ -110,7 +133,7 @@ class UserTest(ApiTest):
         # Then: 200 is returned
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         # Then: The owner of unliked post is returned in the list of users
-        self.assertEqual(resp.json()[0]['username'], self.username)
+        self.assertEqual(resp.json()['results'][0]['username'], self.username)
 
     def test_unauthorized_access(self):
         # Given: Api client with no token
@@ -142,6 +165,58 @@ class PostTest(ApiTest):
         post = Post.objects.filter(data=payload['data']).first()
         self.assertTrue(post)
 
+    def test_bulk_create_posts(self):
+        # Given: List of post payloads
+        user_url = reverse('user-detail', args=(self.api_user.pk,))
+        payload = [{'data': f'bulk {i}', 'creator': user_url} for i in range(3)]
+        # When: The list is sent to posts endpoint
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.api_client.post(reverse('post-list'), payload, format='json')
+        # Then: 201 is returned with created posts
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([post['data'] for post in resp.json()], [item['data'] for item in payload])
+        # Then: Posts are inserted with a single query and counted for the creator
+        self.assertEqual(Post.objects.filter(data__startswith='bulk').count(), 3)
+        post_table = connection.ops.quote_name(Post._meta.db_table)
+        self.assertEqual(len([query for query in queries if query['sql'].startswith(f'INSERT INTO {post_table}')]), 1)
+        self.api_user.profile.refresh_from_db()
+        self.assertEqual(self.api_user.profile.post_count, 4)
+
+    def test_bulk_create_posts_with_invalid_post(self):
+        # Given: List of post payloads with invalid post
+        user_url = reverse('user-detail', args=(self.api_user.pk,))
+        payload = [{'data': 'bulk', 'creator': user_url}, {'data': 'bulk'}]
+        # When: The list is sent to posts endpoint
+        resp = self.api_client.post(reverse('post-list'), payload, format='json')
+        # Then: 400 is returned and no posts are created
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Post.objects.filter(data='bulk').exists())
+
+    def test_fans_can_not_be_set(self):
+        # Given: Post payload with fans
+        user_url = reverse('user-detail', args=(self.api_user.pk,))
+        payload = {'data': 'with fans', 'creator': user_url, 'fans': [user_url]}
+        # When: Fans are sent to create and update posts
+        created = self.api_client.post(reverse('post-list'), payload, format='json')
+        updated = self.api_client.patch(reverse('post-detail', args=(self.post.pk,)), {'fans': [user_url]},
+                                        format='json')
+        bulk_created = self.api_client.post(reverse('post-list'), [payload], format='json')
+        # Then: 400 is returned and fans are not changed
+        self.assertEqual([created.status_code, updated.status_code, bulk_created.status_code],
+                         [status.HTTP_400_BAD_REQUEST] * 3)
+        self.assertFalse(Post.objects.filter(data='with fans').exists())
+        self.assertFalse(self.post.fans.exists())
+
+    def test_bulk_create_too_many_posts(self):
+        # Given: List of posts longer than max batch size
+        user_url = reverse('user-detail', args=(self.api_user.pk,))
+        payload = [{'data': 'bulk', 'creator': user_url}] * 3
+        # When: The list is sent to posts endpoint
+        with self.settings(POSTS_BULK_CREATE_MAX_BATCH=2):
+            resp = self.api_client.post(reverse('post-list'), payload, format='json')
+        # Then: 400 is returned
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_like_post(self):
         # Given: Post is created for user with no likes
         self.assertFalse(self.post.fans.all().count())
@@ -151,6 +226,63 @@ class PostTest(ApiTest):
         self.post.refresh_from_db()
         self.assertTrue(self.api_user in self.post.fans.all())
 
+    def test_like_already_liked_post(self):
+        # Given: Post is liked by the user
+        test_utils.like_post(self.post, self.api_user)
+        # When: Like request is sent once again
+        resp = self.api_client.post(reverse('post-like', args=(self.post.pk,)))
+        # Then: 204 is returned and the user is counted once
+        self.assertEqual(resp.status_code, status.HTTP_204_NO_CONTENT)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.fan_count, 1)
+        self.assertEqual(self.post.fans.count(), 1)
+
+    def test_like_non_existing_post(self):
+        # When: Like request is sent for non existing post
+        resp = self.api_client.post(reverse('post-like', args=(1000,)))
+        # Then: 404 is returned
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_like_queries_do_not_depend_on_number_of_fans(self):
+        # Given: Popular post and a post with one fan
+        fans = [User.objects.create_user(username=f'fan{i}', password='asdf') for i in range(10)]
+        self.post.fans.add(fans[0])
+        popular_post = test_utils.create_post_for_user(self.api_user)
+        popular_post.fans.add(*fans)
+        # When: Both posts are liked
+        with CaptureQueriesContext(connection) as not_popular_queries:
+            self.api_client.post(reverse('post-like', args=(self.post.pk,)))
+        with CaptureQueriesContext(connection) as popular_queries:
+            self.api_client.post(reverse('post-like', args=(popular_post.pk,)))
+        # Then: The same number of queries is performed
+        self.assertEqual(len(not_popular_queries), len(popular_queries))
+
+    def test_like_posts_batch(self):
+        # Given: Post liked by the user and not liked post of another user
+        test_utils.like_post(self.post, self.api_user)
+        fan = User.objects.create_user(username='fan', password='asdf')
+        not_liked_post = test_utils.create_post_for_user(fan)
+        # When: Both posts and non existing post are liked with a batch request
+        payload = {'posts': [self.post.pk, not_liked_post.pk, 1000, not_liked_post.pk]}
+        resp = self.api_client.post(reverse('post-like-batch'), payload, format='json')
+        # Then: Result of each post is returned
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.json(), [{'post': self.post.pk, 'result': 'already_liked'},
+                                       {'post': not_liked_post.pk, 'result': 'liked'},
+                                       {'post': 1000, 'result': 'not_found'}])
+        # Then: Not liked post is liked once and counted
+        not_liked_post.refresh_from_db()
+        self.assertEqual(list(not_liked_post.fans.all()), [self.api_user])
+        self.assertEqual(not_liked_post.fan_count, 1)
+        fan.profile.refresh_from_db()
+        self.assertEqual(fan.profile.liked_post_count, 1)
+
+    def test_like_posts_batch_with_invalid_payload(self):
+        # When: Batch like request is sent with no posts
+        resp = self.api_client.post(reverse('post-like-batch'), {'posts': []}, format='json')
+        # Then: 400 is returned
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_unlike_post(self):
         # Given: Post is created with no likes
         test_utils.like_post(self.post, self.api_user)
@@ -181,7 +313,23 @@ class PostTest(ApiTest):
         # Then: 200 is returned
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         # Then: 1 post item is returned in the list
-        self.assertEqual(len(resp.json()), 1)
+        self.assertEqual(len(resp.json()['results']), 1)
+
+    def test_posts_pagination(self):
+        # Given: 3 posts of the user
+        newer_posts = [test_utils.create_post_for_user(self.api_user) for _ in range(2)]
+        # When: The first page of 2 posts is requested
+        resp = self.api_client.get(f'{reverse("post-list")}?page_size=2')
+        # Then: The newest posts are returned
+        page = resp.json()
+        self.assertEqual([post['data'] for post in page['results']],
+                         [str(post.data) for post in reversed(newer_posts)])
+        # When: Next page is requested
+        resp = self.api_client.get(page['next'])
+        # Then: The oldest post is returned and there are no more pages
+        page = resp.json()
+        self.assertEqual([post['data'] for post in page['results']], [str(self.post.data)])
+        self.assertIsNone(page['next'])
 
     def test_filter_posts_by_user_with_no_posts(self):
         # Given: Post is created
@@ -191,6 +339,24 @@ class PostTest(ApiTest):
         # Then: 400 is returned
         self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_list_posts_queries_do_not_depend_on_number_of_posts(self):
+        # Given: Number of queries for the list with one post
+        with CaptureQueriesContext(connection) as one_post_queries:
+            self.api_client.get(reverse('post-list'))
+        # Given: More liked posts are created
+        fan = User.objects.create_user(username='fan', password='asdf')
+        for _ in range(5):
+            test_utils.like_post(test_utils.create_post_for_user(fan), self.api_user)
+        # When: Posts list is requested
+        with CaptureQueriesContext(connection) as many_posts_queries:
+            resp = self.api_client.get(reverse('post-list'))
+        # Then: All posts with their fans are returned with the same number of queries
+        posts = resp.json()['results']
+        self.assertEqual(len(posts), 6)
+        self.assertEqual(posts[0]['fans'], [f'http://testserver{reverse("user-detail", args=(self.api_user.pk,))}'])
+        self.assertEqual(posts[0]['creator'], f'http://testserver{reverse("user-detail", args=(fan.pk,))}')
+        self.assertEqual(len(one_post_queries), len(many_posts_queries))
+
     def test_get_post(self):
         # Given:  Existing post in database
         self.assertTrue(Post.objects.get(pk=self.post.pk))
@@ -206,6 +372,51 @@ class PostTest(ApiTest):
         self.assertTrue('created_at' in the_post)
         self.assertEqual(the_post['fans'], [])
 
+    def test_list_posts_fans_summary(self):
+        # Given: Post liked by the user and another fan
+        fan = User.objects.create_user(username='fan', password='asdf')
+        test_utils.like_post(self.post, self.api_user)
+        test_utils.like_post(self.post, fan)
+        # When: Posts are requested in summary representation with a sample of 1 fan
+        resp = self.api_client.get(f'{reverse("post-list")}?fans=summary&fan_sample=1')
+        # Then: Number of fans and the latest fan are returned instead of fan urls
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        the_post = resp.json()['results'][0]
+        self.assertNotIn('fans', the_post)
+        self.assertEqual(the_post['fan_count'], 2)
+        self.assertTrue(the_post['liked_by_me'])
+        self.assertEqual(the_post['fan_sample'], [fan.pk])
+
+    def test_get_post_fans_summary_not_liked(self):
+        # When: Not liked post is requested in summary representation without a sample
+        resp = self.api_client.get(f'{reverse("post-detail", args=(self.post.pk,))}?fans=summary')
+        # Then: Post is not liked by the user and no sample is returned
+        the_post = resp.json()
+        self.assertEqual(the_post['fan_count'], 0)
+        self.assertFalse(the_post['liked_by_me'])
+        self.assertIsNone(the_post['fan_sample'])
+
+    def test_fans_summary_with_invalid_sample(self):
+        # When: Posts are requested with invalid sample size
+        resp = self.api_client.get(f'{reverse("post-list")}?fans=summary&fan_sample=many')
+        # Then: 400 is returned
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_post_fans(self):
+        # Given: Post liked by the user
+        test_utils.like_post(self.post, self.api_user)
+        # When: Fans of the post are requested
+        resp = self.api_client.get(reverse('post-fans', args=(self.post.pk,)))
+        # Then: Page with the user is returned
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([user['username'] for user in resp.json()['results']], [self.username])
+
+    def test_get_non_existing_post_fans(self):
+        # When: Fans of non existing post are requested
+        resp = self.api_client.get(reverse('post-fans', args=(1000,)))
+        # Then: 404 is returned
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
     def test_get_non_existing_post(self):
         # Given: post id does not exist
         post_id = 1000
@@ -221,7 +432,8 @@ class PostTest(ApiTest):
         urls = [(reverse('post-list'), unauth_client.get),
                 (reverse('post-detail', args=(1,)), unauth_client.get),
                 (reverse('post-like', args=(1,)), unauth_client.get),
-                (reverse('post-unlike', args=(1,)), unauth_client.get)]
+                (reverse('post-unlike', args=(1,)), unauth_client.get),
+                (reverse('post-fans', args=(1,)), unauth_client.get)]
         for url, method in urls:
             with self.subTest(msg=f'Testing unauthorized request for{url}', url=url, method=method):
                 response = method(url)
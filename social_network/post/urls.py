@@ -1,7 +1,16 @@
+from django.urls import path
 from rest_framework import routers
 
-from social_network.post import views
+from social_network.post import async_views, views
 
 router = routers.DefaultRouter()
 router.register(r'users', views.UserViewSet, basename='user')
 router.register(r'posts', views.PostViewSet, basename='post')
+router.register(r'feed', views.FeedViewSet, basename='feed')
+
+async_urlpatterns = [
+    path('posts/', async_views.post_list, name='async-post-list'),
+    path('posts/<int:pk>/', async_views.post_detail, name='async-post-detail'),
+    path('users/least_favorite/', async_views.users_least_favorite, name='async-user-least-favorite'),
+    path('users/signup/', async_views.users_signup, name='async-user-signup'),
+]
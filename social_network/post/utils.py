@@ -1,32 +1,114 @@
+import hashlib
 import threading
+import time
 
 import clearbit
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
 from django.conf import settings
 from pyhunter import PyHunter
 from rest_framework.serializers import ValidationError
 
+from social_network.post.cache import CacheMetrics, get_cache
 from social_network.post.constants import HunterCodes
+from social_network.post.tasks import enqueue
 
 clearbit.key = settings.CLEARBIT_API_KEY
 hunter = PyHunter(settings.HUNTER_API_KEY)
 
 
-def verify_email(email):
-    """Checks if email is valid and exists at all.
-    :raises
-        ValidationError -  if email address cant be reached"""
+email_verification_metrics = CacheMetrics('email_verification')
+
+
+def verification_cache_key(kind, value):
+    return f'email_verification:{kind}:{hashlib.sha1(value.encode()).hexdigest()}'
+
+
+def get_email_verification_cache_keys(email):
+    address = email.strip().lower()
+    return verification_cache_key('address', address), verification_cache_key('domain', address.rpartition('@')[2])
+
 
+def get_cached_email_verification_result(email):
+    """Returns cached hunter verification result for the email. Domains with no mail servers are cached as
+    undeliverable, so other addresses of the domain are not verified again
+    :returns
+        str - one of HunterCodes values or None if the email has not been verified yet"""
+    address_key, domain_key = get_email_verification_cache_keys(email)
+    cache = get_cache(settings.EMAIL_VERIFICATION_CACHE)
+    if cache.get(domain_key) == HunterCodes.UNDELIVERABLE.value:
+        email_verification_metrics.increment('domain_hits')
+        return HunterCodes.UNDELIVERABLE.value
+    result = cache.get(address_key)
+    if result is not None:
+        email_verification_metrics.increment('hits')
+    return result
+
+
+def fetch_email_verification_result(email):
+    """Verifies the email with hunter and caches the result
+    :returns
+        str - one of HunterCodes values or None if the email could not be verified"""
+    email_verification_metrics.increment('misses')
     try:
         response = hunter.email_verifier(email)
     except:
         # TODO: Verification does not work for now
         #  50 requests a month limit has been reached during testing. To make it work valid hunter key must be provided
-        return
-    if response.get('result') == HunterCodes.UNDELIVERABLE.value:
+        email_verification_metrics.increment('errors')
+        return None
+    address_key, domain_key = get_email_verification_cache_keys(email)
+    cache = get_cache(settings.EMAIL_VERIFICATION_CACHE)
+    result = response.get('result')
+    if result is not None:
+        cache.set(address_key, result, settings.EMAIL_VERIFICATION_TTL)
+    if response.get('mx_records') is False:
+        cache.set(domain_key, HunterCodes.UNDELIVERABLE.value, settings.EMAIL_VERIFICATION_DOMAIN_TTL)
+    return result
+
+
+def get_email_verification_result(email):
+    """Returns hunter verification result for the email, cached result is returned if available
+    :returns
+        str - one of HunterCodes values or None if the email could not be verified"""
+    result = get_cached_email_verification_result(email)
+    if result is not None:
+        return result
+    return fetch_email_verification_result(email)
+
+
+async def get_email_verification_result_async(email):
+    """Async version of get_email_verification_result. Cache and Hunter are called in separate threads, so the event
+    loop is not blocked while the requests are in flight"""
+    result = await sync_to_async(get_cached_email_verification_result, thread_sensitive=False)(email)
+    if result is not None:
+        return result
+    return await sync_to_async(fetch_email_verification_result, thread_sensitive=False)(email)
+
+
+def check_email_verification_result(email, result):
+    if result == HunterCodes.UNDELIVERABLE.value:
         raise ValidationError(f'Email {email} can not be reached ')
 
 
+def verify_email(email):
+    """Checks if email is valid and exists at all.
+    :raises
+        ValidationError -  if email address cant be reached"""
+    if not email:
+        return
+    check_email_verification_result(email, get_email_verification_result(email))
+
+
+async def verify_email_async(email):
+    """Async version of verify_email
+    :raises
+        ValidationError -  if email address cant be reached"""
+    if not email:
+        return
+    check_email_verification_result(email, await get_email_verification_result_async(email))
+
+
 def fetch_name_data(email):
     if not email:
         return {}
@@ -41,14 +123,30 @@ def fetch_name_data(email):
 
 def populate_clearbit_user_data(user_id, email):
     name_data = fetch_name_data(email)
-    user = User.objects.get(pk=user_id)
     if not name_data:
         return
-    user.first_name = name_data['first_name']
-    user.last_name = name_data['last_name']
-    user.save()
+    # Only name columns are written, so concurrent changes of other user fields are not overwritten
+    User.objects.filter(pk=user_id).update(first_name=name_data['first_name'] or '',
+                                           last_name=name_data['last_name'] or '')
 
 
 def populate_clearbit_user_data_async(user_id, email):
-    """ Running async retrieve of user data by email from clearbit"""
-    return threading.Thread(target=populate_clearbit_user_data, args=(user_id, email)).start()
+    """ Schedules retrieve of user data by email from clearbit. Executed by process_tasks management command"""
+    return enqueue(populate_clearbit_user_data, user_id=user_id, email=email)
+
+
+class RateLimiter:
+    """Thread safe limiter that spaces calls of `wait` to not exceed `rate` calls per second"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self.next_call_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            call_at = max(now, self.next_call_at)
+            self.next_call_at = call_at + self.interval
+        if call_at > now:
+            time.sleep(call_at - now)
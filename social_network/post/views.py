@@ -1,13 +1,31 @@
+import hashlib
+from collections import defaultdict
+
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models import Count
-from django.shortcuts import get_object_or_404
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import permissions, status, viewsets
+from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from social_network.post.models import Post
-from social_network.post.serializers import PostSerializer, UserSerializer
+from social_network.post import counters, export, feed, least_favorite, likes
+from social_network.post.constants import FANS_SUMMARY, MAX_FAN_SAMPLE_SIZE
+from social_network.post.models import FeedEntry, Like, Post, Profile, UnlikedAuthor
+from social_network.post.pagination import (CreatedCursorPagination, DateJoinedCursorPagination,
+                                            FeedCursorPagination, UnlikedSinceCursorPagination)
+from social_network.post.permissions import IsAdminUser
+from social_network.post.renderers import NDJSONRenderer
+from social_network.post.serializers import (PostBatchLikeSerializer, PostSerializer, PostSummarySerializer,
+                                             UserSerializer)
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -17,6 +35,12 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all().order_by('-date_joined')
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DateJoinedCursorPagination
+    # Columns rendered by UserSerializer
+    serialized_fields = ['id', 'username', 'email', 'first_name', 'last_name', 'date_joined']
+
+    def get_queryset(self):
+        return super().get_queryset().only(*self.serialized_fields)
 
     @action(methods=['post'], detail=False, permission_classes=[])
     def signup(self, request, pk=None):
@@ -24,11 +48,18 @@ class UserViewSet(viewsets.ModelViewSet):
 
     @action(methods=['get'], detail=False, permission_classes=[permissions.IsAuthenticated])
     def least_favorite(self, request, pk=None):
-        queryset = User.objects.annotate(Count('posts__fans')).annotate(Count('posts')).\
-            filter(posts__count__gte=1).filter(posts__fans__count=0)
-        queryset = self.filter_queryset(queryset)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        url = request.build_absolute_uri()
+        data = least_favorite.get_cached_result(url)
+        if data is None:
+            # Read from the materialized list of unliked authors instead of aggregating all posts and likes
+            user_fields = [f'user__{field}' for field in self.serialized_fields]
+            queryset = UnlikedAuthor.objects.select_related('user').only('since', *user_fields)
+            paginator = UnlikedSinceCursorPagination()
+            page = paginator.paginate_queryset(queryset, request, view=self)
+            serializer = self.get_serializer([author.user for author in page], many=True)
+            data = paginator.get_paginated_response(serializer.data).data
+            least_favorite.cache_result(url, data)
+        return Response(data)
 
 
 class PostViewSet(viewsets.ModelViewSet):
@@ -46,6 +77,26 @@ class PostViewSet(viewsets.ModelViewSet):
     Filtering:
         - filtering by creator id
             /posts/?creator=<user_id>
+    Pagination:
+        - list is paginated with a cursor, newest posts first. Next page is available by "next" link of the response.
+            /posts/?page_size=<number of posts>
+    Fans summary:
+        - list and retrieve return number of fans and whether the post is liked by requesting user instead of fan urls
+            /posts/?fans=summary[&fan_sample=<number of fan ids>]
+        - fans  /posts/<id>/fans/ - paginated list of fans of the post
+        - like  /posts/like/ - allows authenticated users to like a list of posts sent as {"posts": [<id>, ...]}
+            200 is returned with result of every post: liked, already_liked or not_found
+    Conditional requests:
+        - list filtered by creator and retrieve return ETag and Last-Modified headers derived from the version of
+          creator posts. 304 is returned without querying posts if the version has not changed since If-None-Match
+          or If-Modified-Since. Last-Modified has one second precision, ETag should be preferred
+    Bulk creation:
+        - list of posts sent to /posts/ is created with a single insert. Up to POSTS_BULK_CREATE_MAX_BATCH posts
+          could be sent at once. Urls of created posts are null if database does not return ids of inserted rows
+          (SQLite)
+    Fans:
+        - fans are read only, they are changed by like and unlike actions. 400 is returned if fans are sent to create
+          or update a post
 
     """
     queryset = Post.objects.all()
@@ -54,23 +105,183 @@ class PostViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['creator']
+    pagination_class = CreatedCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.is_fans_summary():
+            liked_by_me = Like.objects.filter(post=OuterRef('pk'), user=self.request.user.pk)
+            return queryset.only('id', 'data', 'creator', 'created_at', 'fan_count').\
+                annotate(liked_by_me=Exists(liked_by_me))
+        # Creator url is built from creator_id, fans are fetched for the whole page with one query
+        return queryset.only('id', 'data', 'creator', 'created_at').\
+            prefetch_related(Prefetch('fans', queryset=User.objects.only('id')))
+
+    def list(self, request, *args, **kwargs):
+        creator_id = request.query_params.get('creator', '')
+        version = self.get_posts_version(user=creator_id) if creator_id.isdigit() else None
+        return self.conditional_response(version, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = str(kwargs.get(self.lookup_field, ''))
+        version = self.get_posts_version(user__posts=pk) if pk.isdigit() else None
+        return self.conditional_response(version, super().retrieve, request, *args, **kwargs)
+
+    @staticmethod
+    def get_posts_version(**profile_filter):
+        """:returns
+            tuple - (posts_version, posts_modified_at) of the creator profile or None if there is no profile"""
+        return Profile.objects.filter(**profile_filter).values_list('posts_version', 'posts_modified_at').first()
+
+    def conditional_response(self, version, handler, request, *args, **kwargs):
+        """Returns 304 if the client has the current version of the response, otherwise the response of handler.
+        Response content depends on the url and, for fans summary, on the requesting user, so both are part of ETag"""
+        if version is None:
+            return handler(request, *args, **kwargs)
+        posts_version, modified_at = version
+        variant = request.build_absolute_uri()
+        if self.is_fans_summary():
+            variant += f'#{request.user.pk}'
+        etag = quote_etag(f'{posts_version}-{hashlib.sha1(variant.encode()).hexdigest()[:16]}')
+        last_modified = int(modified_at.timestamp()) if modified_at else None
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        if len(request.data) > settings.POSTS_BULK_CREATE_MAX_BATCH:
+            raise ValidationError(f'Up to {settings.POSTS_BULK_CREATE_MAX_BATCH} posts could be created at once')
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        posts = [Post(data=item['data'], creator=item['creator']) for item in serializer.validated_data]
+        with transaction.atomic():
+            # bulk_create does not send post_save, so counters and feeds are updated here
+            Post.objects.bulk_create(posts)
+            posts_by_creator = defaultdict(list)
+            for post in posts:
+                posts_by_creator[post.creator_id].append(post)
+            for creator_id, creator_posts in posts_by_creator.items():
+                counters.post_created(creator_id, len(creator_posts))
+                feed.fan_out_async(creator_id, creator_posts)
+        for post in posts:
+            # New posts have no fans, serializer should not query them
+            post._prefetched_objects_cache = {'fans': User.objects.none()}
+        return Response(self.get_serializer(posts, many=True).data, status=status.HTTP_201_CREATED)
+
+    def get_serializer_class(self):
+        if self.is_fans_summary():
+            return PostSummarySerializer
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.is_fans_summary():
+            context['fan_sample_size'] = self.get_fan_sample_size()
+        return context
+
+    def is_fans_summary(self):
+        return self.action in ('list', 'retrieve') and self.request.query_params.get('fans') == FANS_SUMMARY
+
+    def get_fan_sample_size(self):
+        sample_size = self.request.query_params.get('fan_sample', '0')
+        if not sample_size.isdigit():
+            raise ValidationError({'fan_sample': 'A non negative integer is required'})
+        return min(int(sample_size), MAX_FAN_SAMPLE_SIZE)
+
+    @action(methods=['get'], detail=True, permission_classes=[permissions.IsAuthenticated])
+    def fans(self, request, pk=None):
+        self.get_creator_id(pk)
+        queryset = User.objects.filter(preferences=pk).only(*UserViewSet.serialized_fields)
+        paginator = DateJoinedCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = UserSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
 
     @action(methods=['post'], detail=True, permission_classes=[permissions.IsAuthenticated])
     def like(self, request, pk=None):
-        post = get_object_or_404(Post, pk=pk)
-        user = request.user
-        if user in post.fans.all():
+        if not likes.like_post(pk, self.get_creator_id(pk), request.user.pk):
             return Response('Post is already liked. No need to do it anymore',
                             status.HTTP_204_NO_CONTENT)
-        post.fans.add(request.user)
         return Response('Post is liked', status.HTTP_202_ACCEPTED)
 
+    @action(methods=['post'], detail=False, permission_classes=[permissions.IsAuthenticated], url_path='like',
+            url_name='like-batch')
+    def like_batch(self, request):
+        serializer = PostBatchLikeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = likes.like_posts(serializer.validated_data['posts'], request.user.pk)
+        return Response([{'post': post_id, 'result': result} for post_id, result in results.items()])
+
     @action(methods=['post'], detail=True, permission_classes=[permissions.IsAuthenticated])
     def unlike(self, request, pk=None):
-        post = get_object_or_404(Post, pk=pk)
-        user = request.user
-        if user not in post.fans.all():
+        if not likes.unlike_post(pk, self.get_creator_id(pk), request.user.pk):
             return Response(data='Post cant be unliked by the user. It was not liked previously',
                             status=status.HTTP_403_FORBIDDEN)
-        post.fans.remove(user)
         return Response(status=status.HTTP_202_ACCEPTED)
+
+    @staticmethod
+    def get_creator_id(pk):
+        creator_id = Post.objects.filter(pk=pk).values_list('creator_id', flat=True).first()
+        if creator_id is None:
+            raise Http404
+        return creator_id
+
+
+class FeedViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    API endpoint with the feed of the requesting user: posts of authors whose posts the user has liked, newest first.
+    Posts are represented as in fans summary mode of /posts/?fans=summary
+    Feed is precomputed by background tasks when posts are created, see social_network.post.feed
+    Pagination:
+        - feed is paginated with a cursor. Next page is available by "next" link of the response.
+            /feed/?page_size=<number of posts>
+    """
+    serializer_class = PostSummarySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedCursorPagination
+
+    def get_queryset(self):
+        post_fields = [f'post__{field}' for field in ('id', 'data', 'creator', 'created_at', 'fan_count')]
+        liked_by_me = Like.objects.filter(post=OuterRef('post'), user=self.request.user.pk)
+        return FeedEntry.objects.filter(user=self.request.user.pk).select_related('post').\
+            only('created_at', 'post', *post_fields).annotate(liked_by_me=Exists(liked_by_me))
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        posts = []
+        for entry in page:
+            entry.post.liked_by_me = entry.liked_by_me
+            posts.append(entry.post)
+        return self.get_paginated_response(self.get_serializer(posts, many=True).data)
+
+
+class ExportView(APIView):
+    """
+    API endpoint that streams all users, posts and likes as NDJSON, see social_network.post.export for the format.
+    Available to staff users only.
+        /export/?gzip=1 - the stream is compressed with gzip
+    Served by the WSGI application only. ASGI handler of Django 3.1 iterates streaming responses in the event loop,
+    so every database read of the export would block all requests of the worker. 404 is returned under ASGI
+    """
+    permission_classes = [IsAdminUser]
+    renderer_classes = [NDJSONRenderer, JSONRenderer]
+
+    def get(self, request):
+        if isinstance(request._request, ASGIRequest):
+            raise NotFound('Export is served by the WSGI application only')
+        lines = export.iter_lines(settings.EXPORT_CHUNK_SIZE)
+        compressed = request.query_params.get('gzip') in ('1', 'true')
+        if compressed:
+            lines = export.gzip_stream(lines)
+        response = StreamingHttpResponse(lines, content_type='application/gzip' if compressed else
+                                         NDJSONRenderer.media_type)
+        filename = 'export.ndjson.gz' if compressed else 'export.ndjson'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
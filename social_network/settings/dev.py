@@ -86,6 +86,9 @@ DATABASES = {
     }
 }
 
+# PRAGMA statements executed for every new SQLite connection, e.g. {'journal_mode': 'WAL'}
+SQLITE_PRAGMAS = {}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
@@ -106,9 +109,21 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# First hasher hashes new passwords, others verify passwords hashed before the hasher was changed
+PASSWORD_HASHERS = [
+    'social_network.post.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+# Work factor of social_network.post.hashers.PBKDF2PasswordHasher. Default of Django 3.1
+PASSWORD_HASH_ITERATIONS = 216000
+# Number of processes computing password hashes. 0 - hashes are computed by request threads
+PASSWORD_HASHING_WORKERS = 0
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'social_network.post.authentication.JWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
 }
@@ -141,6 +156,51 @@ if not CLEARBIT_API_KEY:
     sys.exit('CLEARBIT_API_KEY must not be empty. Set it up in setting file')
 
 
+# Max number of posts created by one bulk request to /api/posts/
+POSTS_BULK_CREATE_MAX_BATCH = 500
+# Max number of posts liked by one request to /api/posts/like/
+POSTS_BATCH_LIKE_MAX_BATCH = 500
+# Number of feed entries inserted by one query when a post is added to feeds of the creator fans
+FEED_FAN_OUT_BATCH = 1000
+# Number of rows fetched at once by /api/export/
+EXPORT_CHUNK_SIZE = 2000
+
+# Caches used by the project. If alias is not configured in CACHES in-process LRU cache of FALLBACK_CACHE_MAX_SIZE
+# entries is used instead
+FALLBACK_CACHE_MAX_SIZE = 10000
+EMAIL_VERIFICATION_CACHE = 'email_verification'
+# Seconds to keep hunter result for an email address
+EMAIL_VERIFICATION_TTL = 24 * 60 * 60
+# Seconds to reject all addresses of a domain that has no mail servers
+EMAIL_VERIFICATION_DOMAIN_TTL = 60 * 60
+LEAST_FAVORITE_CACHE = 'least_favorite'
+# Max seconds least_favorite result is served from cache. Results are invalidated once posts or likes are changed,
+# the timeout bounds staleness when invalidation does not reach the cache (in-process cache of another worker)
+LEAST_FAVORITE_CACHE_TTL = 30
+
+# Hits and misses of caches with metrics are logged every CACHE_METRICS_LOG_INTERVAL lookups
+CACHE_METRICS_LOG_INTERVAL = int(os.environ.get('CACHE_METRICS_LOG_INTERVAL', 100))
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {'social_network.metrics': {'handlers': ['console'], 'level': 'INFO', 'propagate': False}},
+}
+
+# Number of users kept in process by JWT authentication for views that need the user model instance
+AUTH_USER_CACHE_SIZE = 1000
+# Seconds a user is kept, bounds staleness of user data in other processes
+AUTH_USER_CACHE_TTL = 60
+
+# Background tasks executed by "python manage.py process_tasks"
+# Number of tasks executed in parallel
+TASK_QUEUE_CONCURRENCY = int(os.environ.get('TASK_QUEUE_CONCURRENCY', 4))
+# Failed task is retried after TASK_QUEUE_RETRY_BACKOFF * 2 ^ (attempt - 1) seconds
+TASK_QUEUE_MAX_ATTEMPTS = 5
+TASK_QUEUE_RETRY_BACKOFF = 10
+# Running task is considered lost (e.g. worker was killed) and is executed again after the timeout in seconds
+TASK_QUEUE_LOCK_TIMEOUT = 300
+
 # If django is going to be started on different host/port API_URL must be specified as environment variable
 API_URL = os.environ.get('API_URL')
 if not API_URL:
@@ -0,0 +1,57 @@
+"""
+Production settings.
+
+Database is chosen by DATABASE_BACKEND environment variable:
+    - sqlite (default) - single node deployment. WAL journal lets readers work while a write is in progress,
+      writers wait for the lock up to SQLITE_BUSY_TIMEOUT seconds instead of failing with "database is locked"
+    - postgresql - connection parameters are taken from POSTGRES_* environment variables. Connections are kept
+      alive by every worker for CONN_MAX_AGE seconds. To pool connections between workers run PgBouncer in
+      transaction mode in front of the database and set POSTGRES_PGBOUNCER=1. psycopg2 must be installed
+"""
+from social_network.settings.dev import *
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('SECRET_KEY', SECRET_KEY)
+
+ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', '127.0.0.1,localhost').split(',')
+
+DATABASE_BACKEND = os.environ.get('DATABASE_BACKEND', 'sqlite')
+CONN_MAX_AGE = int(os.environ.get('CONN_MAX_AGE', 600))
+
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', PASSWORD_HASH_ITERATIONS))
+# Hashing pool is created by every server worker process, see social_network.post.hashers before enabling it
+PASSWORD_HASHING_WORKERS = int(os.environ.get('PASSWORD_HASHING_WORKERS', 0))
+
+if DATABASE_BACKEND == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'social_network'),
+            'USER': os.environ.get('POSTGRES_USER', 'social_network'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', '127.0.0.1'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            # Server side cursors do not work with PgBouncer transaction pooling
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('POSTGRES_PGBOUNCER') == '1',
+            'OPTIONS': {'connect_timeout': 5},
+        }
+    }
+elif DATABASE_BACKEND == 'sqlite':
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20))
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'OPTIONS': {'timeout': SQLITE_BUSY_TIMEOUT},
+        }
+    }
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        # Durable on application crash. Last transactions could be lost only on power loss
+        'synchronous': 'NORMAL',
+    }
+else:
+    sys.exit(f'DATABASE_BACKEND must be sqlite or postgresql. {DATABASE_BACKEND} is not supported')
@@ -7,3 +7,5 @@ DATABASES = DATABASES = {
     }
 }
 ADMINS = ()
+# Hashing strength is not tested, fast hasher keeps user creation cheap
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -17,11 +17,16 @@ from django.contrib import admin
 from django.urls import include, path
 from rest_framework_simplejwt import views as jwt_views
 
-from social_network.post.urls import router
+from social_network.post.authentication import TokenObtainPairSerializer
+from social_network.post.urls import async_urlpatterns, router
+from social_network.post.views import ExportView
 
 urlpatterns = [
     path('api/', include(router.urls)),
+    path('api/async/', include(async_urlpatterns)),
+    path('api/export/', ExportView.as_view(), name='export'),
     path('admin/', admin.site.urls),
-    path('api/token/', jwt_views.TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/', jwt_views.TokenObtainPairView.as_view(serializer_class=TokenObtainPairSerializer),
+         name='token_obtain_pair'),
     path('api/token/refresh/', jwt_views.TokenRefreshView.as_view(), name='token_refresh'),
 ]